@@ -0,0 +1,339 @@
+import contextlib
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from typing import Final
+from typing import cast
+
+import click
+
+import package
+from internal.config import Config as InternalConfig
+from package.bench import Case
+from package.command import CommandContext
+from package.command import CommandException
+from package.command import CommandPath
+from package.config import Config
+from package.config import ConfigMeta
+from package.config import load_config
+from package.daemon import DAEMON_SOCKET_ENV_VAR
+from package.logger.formatter import ConsoleFormatter
+from package.logger.formatter import Formatter
+from package.logger.handler import TimedRotatingFileHandler
+from package.queue import Queue
+from package.queue import Task
+
+MAIN_FILE_PATH: Final = Path(__file__).resolve().parent.parent / "main.py"
+DEFAULT_OUTPUT_PATH: Final = Path("bench/latest.json")
+LOG_FORMAT: Final = "%(asctime)s %(levelname)s %(name)s:%(lineno)d %(message)s"
+HUGE_SECTIONS: Final = 200
+HUGE_FIELDS: Final = 24
+QUEUE_BATCH: Final = 100
+
+
+class BenchContext:
+    def __init__(self, config_file_path: Path, work_dir: Path, warmup: int, repeat: int) -> None:
+        self.config_file_path = config_file_path
+        self.work_dir = work_dir
+        self.warmup = warmup
+        self.repeat = repeat
+
+
+SuiteFunc = Callable[[BenchContext], list[Case]]
+
+
+def startup_suite(bench: BenchContext) -> list[Case]:
+    env = {key: value for key, value in os.environ.items() if key != DAEMON_SOCKET_ENV_VAR}
+    repeat = max(5, bench.repeat // 4)
+
+    def run(*args: str) -> Callable[[], None]:
+        argv = [sys.executable, str(MAIN_FILE_PATH), *args]
+
+        def func() -> None:
+            subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, check=True)
+
+        return func
+
+    return [
+        Case(name="startup.help", func=run("--help"), repeat=repeat),
+        Case(name="startup.echo", func=run("-c", str(bench.config_file_path), "echo"), repeat=repeat),
+    ]
+
+
+def _toml_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return f'"{value}"'
+    if isinstance(value, list):
+        return "[" + ", ".join(_toml_value(item) for item in cast(list[Any], value)) + "]"
+    if isinstance(value, dict):
+        items = cast(dict[str, Any], value).items()
+        return "{ " + ", ".join(f"{key} = {_toml_value(item)}" for key, item in items) + " }"
+    return repr(value)
+
+
+def huge_schema(sections: int, fields: int) -> tuple[type[Config], dict[str, Any]]:
+    kinds: list[tuple[Any, Callable[[int], Any]]] = [
+        (int, lambda idx: idx),
+        (str, lambda idx: f"value-{idx}"),
+        (float, lambda idx: idx / 3),
+        (bool, lambda idx: idx % 2 == 0),
+        (list[int], lambda idx: list(range(idx % 8))),
+        (dict[str, int], lambda idx: {f"k{key}": key for key in range(idx % 6)}),
+    ]
+
+    root_annotations: dict[str, Any] = {}
+    data: dict[str, Any] = {}
+    for section_idx in range(sections):
+        annotations: dict[str, Any] = {}
+        section_data: dict[str, Any] = {}
+        for field_idx in range(fields):
+            annotation, make_value = kinds[field_idx % len(kinds)]
+            annotations[f"field_{field_idx}"] = annotation
+            section_data[f"field_{field_idx}"] = make_value(section_idx + field_idx)
+        name = f"HugeSection{section_idx}"
+        root_annotations[f"section_{section_idx}"] = ConfigMeta(
+            name, (Config,), {"__annotations__": annotations, "__module__": __name__, "__qualname__": name}
+        )
+        data[f"section_{section_idx}"] = section_data
+
+    root = ConfigMeta("HugeConfig", (Config,), {"__annotations__": root_annotations, "__module__": __name__})
+    return root, data
+
+
+def config_suite(bench: BenchContext) -> list[Case]:
+    huge_config_cls, huge_data = huge_schema(sections=HUGE_SECTIONS, fields=HUGE_FIELDS)
+    huge_file_path = bench.work_dir / "huge.toml"
+    with huge_file_path.open("w", encoding="utf-8") as file:
+        for section, values in huge_data.items():
+            file.write(f"[{section}]\n")
+            for key, value in values.items():
+                file.write(f"{key} = {_toml_value(value)}\n")
+
+    small_data = load_config(config_file_path=bench.config_file_path)
+    errors = InternalConfig.validate(small_data)
+    if errors:
+        raise CommandException(f"Invalid config {bench.config_file_path}: {errors[0]}")
+    # validation mode parses the same way but skips __post_init__ (logging setup, tzset), so only parsing is timed
+    return [
+        Case(
+            name="config.small.load",
+            func=lambda: InternalConfig.validate(load_config(config_file_path=bench.config_file_path)),
+            number=20,
+        ),
+        Case(name="config.small.validate", func=lambda: InternalConfig.validate(small_data), number=20),
+        Case(
+            name="config.huge.load",
+            func=lambda: huge_config_cls.from_mapping(load_config(config_file_path=huge_file_path)),
+        ),
+        Case(name="config.huge.from_mapping", func=lambda: huge_config_cls.from_mapping(huge_data)),
+    ]
+
+
+def logger_suite(bench: BenchContext) -> list[Case]:
+    record = logging.LogRecord(
+        name="bench",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=1,
+        msg="request %s finished in %.3fs",
+        args=("GET /", 0.012),
+        exc_info=None,
+    )
+    formatter = Formatter(fmt=LOG_FORMAT)
+    console_formatter = ConsoleFormatter(fmt=LOG_FORMAT)
+    handler = TimedRotatingFileHandler(filename=str(bench.work_dir / "bench.log"), when="midnight")
+    handler.setFormatter(formatter)
+
+    return [
+        Case(name="logger.formatter", func=lambda: formatter.format(record), number=10_000),
+        Case(name="logger.console_formatter", func=lambda: console_formatter.format(record), number=10_000),
+        Case(name="logger.handler.emit", func=lambda: handler.handle(record), number=10_000, teardown=handler.close),
+    ]
+
+
+def command_suite(bench: BenchContext) -> list[Case]:
+    @package.command.command(name="sync-noop")
+    def sync_command() -> None:
+        pass
+
+    @package.command.command(name="async-noop")
+    async def async_command() -> None:
+        pass
+
+    sync_callback = sync_command.callback
+    async_callback = async_command.callback
+    assert sync_callback is not None and async_callback is not None
+
+    return [
+        Case(name="command.sync.callback", func=sync_callback, number=10_000),
+        Case(name="command.async.callback", func=async_callback, number=1_000),
+        Case(
+            name="command.sync.main",
+            func=lambda: sync_command.main(args=[], standalone_mode=False),
+            number=1_000,
+        ),
+        Case(
+            name="command.async.main",
+            func=lambda: async_command.main(args=[], standalone_mode=False),
+            number=1_000,
+        ),
+    ]
+
+
+def metrics_suite(bench: BenchContext) -> list[Case]:
+    metrics_registry = package.metrics.Registry()
+    counter = metrics_registry.register(package.metrics.Counter("bench_total", "Bench.", ("kind",))).labels("inc")
+    histogram = metrics_registry.register(package.metrics.Histogram("bench_seconds", "Bench.", ("kind",))).labels("observe")
+    for idx in range(1_000):
+        histogram.observe(idx / 1_000)
+
+    return [
+        Case(name="metrics.counter.inc", func=counter.inc, number=100_000),
+        Case(name="metrics.histogram.observe", func=lambda: histogram.observe(0.042), number=100_000),
+        Case(name="metrics.exposition", func=metrics_registry.exposition, number=100),
+    ]
+
+
+def queue_suite(bench: BenchContext) -> list[Case]:
+    batch = QUEUE_BATCH
+    tasks = [Task(module="bench", args=(idx,), priority=idx % 3) for idx in range(batch)]
+    queues: list[Queue] = []
+
+    def open_queue(name: str) -> Queue:
+        queue = Queue(path=bench.work_dir / f"{name}.sqlite3", name=name)
+        queues.append(queue)
+        return queue
+
+    single = open_queue("enqueue-single")
+    batched = open_queue("enqueue-batch")
+    consume = open_queue("dequeue-batch")
+    round_trip = open_queue("round-trip")
+
+    def dequeue_complete(queue: Queue) -> None:
+        leases = queue.dequeue(limit=batch)
+        assert len(leases) == batch, "queue drained before the benchmark finished"
+        queue.complete(leases)
+
+    def round_trip_batch() -> None:
+        round_trip.enqueue_many(tasks)
+        dequeue_complete(round_trip)
+
+    def fill_consume() -> None:
+        # every warmup and timed run of the dequeue case consumes one batch
+        for _ in range(bench.warmup + bench.repeat):
+            consume.enqueue_many(tasks)
+
+    def close_queues() -> None:
+        for queue in queues:
+            queue.close()
+
+    return [
+        Case(name="queue.enqueue.single", func=lambda: single.enqueue(tasks[0]), number=100),
+        Case(name=f"queue.enqueue.batch{batch}", func=lambda: batched.enqueue_many(tasks)),
+        Case(
+            name=f"queue.dequeue_complete.batch{batch}",
+            func=lambda: dequeue_complete(consume),
+            setup=fill_consume,
+        ),
+        Case(name=f"queue.round_trip.batch{batch}", func=round_trip_batch, teardown=close_queues),
+    ]
+
+
+SUITES: Final[dict[str, SuiteFunc]] = {
+    "startup": startup_suite,
+    "config": config_suite,
+    "logger": logger_suite,
+    "command": command_suite,
+    "metrics": metrics_suite,
+    "queue": queue_suite,
+}
+
+
+@package.command.command(name="bench", help="Benchmark the project's hot paths and compare against a saved baseline.")
+@package.command.option(
+    "-s",
+    "--suite",
+    "suites",
+    type=click.Choice(list(SUITES)),
+    multiple=True,
+    help="Suite to run, repeatable. [Default: all]",
+)
+@package.command.option("--warmup", type=click.IntRange(min=0), default=3, show_default=True, help="Warmup runs per case.")
+@package.command.option("--repeat", type=click.IntRange(min=2), default=20, show_default=True, help="Timed runs per case.")
+@package.command.option(
+    "-o",
+    "--output",
+    "output_path",
+    type=CommandPath(dir_okay=False, path_type=Path),
+    default=DEFAULT_OUTPUT_PATH,
+    show_default=True,
+    help="JSON result file.",
+)
+@package.command.option(
+    "-b",
+    "--baseline",
+    "baseline_path",
+    type=CommandPath(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Baseline JSON result file to compare against.",
+)
+@package.command.option(
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=10.0,
+    show_default=True,
+    help="Allowed median slowdown against the baseline, in percent.",
+)
+@package.command.pass_context
+def command(
+    ctx: CommandContext,
+    suites: tuple[str, ...],
+    warmup: int,
+    repeat: int,
+    output_path: Path,
+    baseline_path: Path | None,
+    threshold: float,
+) -> None:
+    config_file_path: Path = ctx.find_root().params["config_file_path"]
+
+    with contextlib.ExitStack() as stack:
+        work_dir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="bench-")))
+        bench = BenchContext(config_file_path=config_file_path, work_dir=work_dir, warmup=warmup, repeat=repeat)
+
+        results: list[package.bench.Result] = []
+        for suite in suites or tuple(SUITES):
+            cases = SUITES[suite](bench)
+            results += package.bench.run(
+                cases=cases,
+                warmup=warmup,
+                repeat=repeat,
+                report=lambda result: package.command.echo(package.bench.format_result(result=result)),
+            )
+
+    package.bench.write(path=output_path, results=results)
+    package.command.echo(f"Results written to {output_path}")
+
+    if baseline_path is None:
+        return
+
+    regressions = package.bench.compare(
+        results=results,
+        baseline=package.bench.load_baseline(path=baseline_path),
+        threshold=threshold,
+    )
+    for regression in regressions:
+        package.command.echo(
+            f"REGRESSION {regression.name}: {package.bench.format_seconds(regression.baseline)} -> "
+            f"{package.bench.format_seconds(regression.current)} (+{regression.change:.1f}%)",
+            err=True,
+        )
+    if regressions:
+        raise CommandException(f"{len(regressions)} benchmarks regressed more than {threshold:.1f}% against {baseline_path}.")
+    package.command.echo(f"No regressions over {threshold:.1f}% against {baseline_path}.")
@@ -0,0 +1,70 @@
+import os
+from pathlib import Path
+
+import click
+
+import package
+from internal.config import Config
+from package.command import CommandException
+from package.command import CommandPath
+from package.validation import ResultCache
+
+DEFAULT_CACHE_PATH = Path(".cache/config-validate.json")
+
+
+@package.command.group(name="config", help="Config file tools.")
+def command() -> None:
+    pass
+
+
+@command.command(
+    name="validate",
+    help="Validate config files (directories, globs or paths) against the application schema without side effects.",
+)
+@package.command.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default="CPU count",
+    help="Worker processes.",
+)
+@package.command.option(
+    "--cache",
+    "cache_path",
+    type=CommandPath(dir_okay=False, path_type=Path),
+    default=DEFAULT_CACHE_PATH,
+    show_default=True,
+    help="Result cache keyed by file content hash.",
+)
+@package.command.option("--no-cache", is_flag=True, default=False, help="Validate every file even if unchanged.")
+@package.command.argument("targets", nargs=-1, required=True, metavar="TARGET...")
+def validate(jobs: int, cache_path: Path, no_cache: bool, targets: tuple[str, ...]) -> None:
+    paths = package.validation.collect_files(targets=targets)
+    if not paths:
+        raise CommandException(f"No config files match: {' '.join(targets)}")
+
+    cache = None
+    if not no_cache:
+        cache = ResultCache(path=cache_path, fingerprint=package.validation.schema_fingerprint(config_cls=Config))
+
+    failed = 0
+    cached = 0
+    try:
+        for result in package.validation.validate_files(config_cls=Config, paths=paths, workers=jobs, cache=cache):
+            cached += result.cached
+            suffix = " (cached)" if result.cached else ""
+            if result.ok:
+                package.command.echo(f"OK   {result.path}{suffix}")
+                continue
+            failed += 1
+            package.command.echo(f"FAIL {result.path}{suffix}")
+            for error in result.errors:
+                package.command.echo(f"     {error}")
+    finally:
+        if cache is not None:
+            cache.save()
+
+    package.command.echo(f"{len(paths)} files, {failed} failed, {cached} cached.")
+    if failed:
+        raise CommandException(f"{failed} of {len(paths)} config files are invalid.")
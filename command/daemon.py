@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import cast
+
+import package
+from internal import config
+from package.command import CommandPath
+from package.daemon import DAEMON_COMMAND_NAME
+from package.daemon import DAEMON_SOCKET_ENV_VAR
+from package.daemon import Daemon
+
+
+def exit_code(exc: SystemExit) -> int:
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    package.command.echo(str(exc.code), err=True)
+    return 1
+
+
+@package.command.command(
+    name=DAEMON_COMMAND_NAME,
+    help=f"Keep a warm interpreter with config loaded and run forwarded commands. Clients opt in with {DAEMON_SOCKET_ENV_VAR}.",
+)
+@package.command.option(
+    "-s",
+    "--socket",
+    "socket_path",
+    type=CommandPath(dir_okay=False, path_type=Path),
+    required=True,
+    envvar=DAEMON_SOCKET_ENV_VAR,
+    help=f"Unix socket path. [Env: {DAEMON_SOCKET_ENV_VAR}]",
+)
+@package.command.pass_context
+def command(ctx: package.command.CommandContext, socket_path: Path) -> None:
+    root_ctx = ctx.find_root()
+    config_file_path: Path | None = root_ctx.params.get("config_file_path")
+
+    def prepare() -> None:
+        config.load(config_file_path=config_file_path)
+
+    def run(argv: list[str]) -> int:
+        try:
+            root_ctx.command.main(args=argv, standalone_mode=True)
+        except SystemExit as exc:
+            return exit_code(exc)
+        return 0
+
+    # subcommands are imported lazily; import them all up front so forked requests start warm
+    group = cast(package.command.Group, root_ctx.command)
+    for name in group.list_commands(root_ctx):
+        group.get_command(root_ctx, name)
+
+    # no exporters here: requests run in forked children, and long-running commands start their own exporters there
+    Daemon(socket_path=socket_path, run=run, prepare=prepare).serve_forever()
@@ -1,37 +1,95 @@
 from pathlib import Path
 
+import click
+
 import package
-from command import echo
-from command import script
-from command import shell
 from internal import config
+from package.command import CommandContext
 from package.command import CommandPath
+from package.command import LazyGroup
 from package.config import CONFIG_ENV_VAR
 from package.config import DEFAULT_CONFIG_FILE_PATH
 from package.config import normalize_config_file_path
+from package.profiler import ProfileMode
+from package.profiler import Profiler
+
+PROFILE_DIR_ENV_VAR = "PROFILE_DIR"
+DEFAULT_PROFILE_DIR = Path("profile")
+
+
+def finish_profile(profiler: Profiler) -> None:
+    summary = profiler.stop()
+    package.command.echo(summary, err=True, nl=False)
+    package.command.echo(f"Profile written to {profiler.output_path}", err=True)
 
 
 @package.command.group(
+    cls=LazyGroup,
+    # subcommand modules are imported on use so heavy dependencies (IPython, bench suites) stay off the cold start
+    lazy_subcommands={
+        name: f"command.{name}"
+        for name in ("bench", "config", "daemon", "echo", "schedule", "script", "serve", "shell", "worker")
+    },
     context_settings={
         "terminal_width": 128,
         "max_content_width": 128,
         "help_option_names": ["-h", "--help"],
-    }
+    },
 )
 @package.command.option(
     "-c",
     "--config",
     "config_file_path",
-    type=CommandPath(exists=True, dir_okay=False, readable=True, path_type=Path),
+    type=CommandPath(dir_okay=False, path_type=Path),
     default=DEFAULT_CONFIG_FILE_PATH,
     envvar=CONFIG_ENV_VAR,
-    callback=normalize_config_file_path,
     help=f"Set config file path. [Env: {CONFIG_ENV_VAR}][Default: {DEFAULT_CONFIG_FILE_PATH}]",
 )
-def command(config_file_path: Path | None) -> None:
-    config.load(config_file_path=config_file_path)
+@package.command.option(
+    "--profile",
+    "profile_mode",
+    type=click.Choice([mode.value for mode in ProfileMode]),
+    default=None,
+    help="Profile the subcommand: cpu (cProfile), wall (sampling) or alloc (tracemalloc).",
+)
+@package.command.option(
+    "--profile-dir",
+    type=CommandPath(file_okay=False, path_type=Path),
+    default=DEFAULT_PROFILE_DIR,
+    envvar=PROFILE_DIR_ENV_VAR,
+    help=f"Profile output directory. [Env: {PROFILE_DIR_ENV_VAR}][Default: {DEFAULT_PROFILE_DIR}]",
+)
+@package.command.option(
+    "--profile-top",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Number of entries in the profile summary.",
+)
+@package.command.pass_context
+def command(
+    ctx: CommandContext,
+    config_file_path: Path | None,
+    profile_mode: str | None,
+    profile_dir: Path,
+    profile_top: int,
+) -> None:
+    if profile_mode is not None:
+        profiler = package.profiler.start(
+            mode=ProfileMode(profile_mode),
+            output_dir=profile_dir,
+            name=ctx.invoked_subcommand or "root",
+            top=profile_top,
+        )
+        ctx.call_on_close(lambda: finish_profile(profiler=profiler))
 
+    if ctx.invoked_subcommand == "config":
+        # config tools check their own files; the app config is neither required nor applied
+        return
 
-command.add_command(echo.command)
-command.add_command(shell.command)
-command.add_command(script.command)
+    # resolved here rather than in an option callback so a missing config file does not break `config`
+    config_file_path = normalize_config_file_path(config_file_path)
+    ctx.params["config_file_path"] = config_file_path
+    config.load(config_file_path=config_file_path).apply()
+    ctx.call_on_close(package.resource.registry.close)
+    ctx.call_on_close(package.queue.close)
@@ -0,0 +1,51 @@
+import package
+from command import script
+from internal import config
+from package.command import CommandException
+from package.scheduler import CronExpression
+from package.scheduler import Job
+from package.scheduler import Scheduler
+
+
+def build_jobs() -> list[Job]:
+    jobs: list[Job] = []
+    for job_config in config.schedule.jobs:
+        if not job_config.enabled:
+            continue
+        func = script.load_function(module=job_config.module, function_name=job_config.function)
+        try:
+            jobs.append(
+                Job(
+                    name=job_config.name,
+                    func=func,
+                    interval=job_config.interval,
+                    cron=CronExpression(job_config.cron) if job_config.cron is not None else None,
+                    jitter=job_config.jitter,
+                )
+            )
+        except ValueError as exc:
+            raise CommandException(f"Invalid schedule job '{job_config.name}': {exc}") from exc
+    return jobs
+
+
+@package.command.command(
+    name="schedule",
+    help="Run the script functions in the schedule job table periodically in one event loop.",
+)
+async def command() -> None:
+    jobs = build_jobs()
+    if not jobs:
+        raise CommandException("No enabled jobs in schedule.jobs.")
+
+    schedule_config = config.schedule
+    try:
+        scheduler = Scheduler(
+            jobs=jobs,
+            thread_pool_size=schedule_config.thread_pool_size,
+            report_interval=schedule_config.report_interval,
+            shutdown_timeout=schedule_config.shutdown_timeout,
+        )
+    except ValueError as exc:
+        raise CommandException(str(exc)) from exc
+    with config.metrics.exporters():
+        await scheduler.run()
@@ -1,5 +1,7 @@
 import importlib
 import inspect
+import sys
+from collections.abc import AsyncIterator
 from collections.abc import Awaitable
 from collections.abc import Callable
 from types import ModuleType
@@ -10,9 +12,11 @@ import click
 
 import package
 from package.command import CommandException
+from package.command import CommandPath
+from package.stream import RecordFormat
 
-SyncScriptFunc = Callable[[], Any]
-AsyncScriptFunc = Callable[[], Awaitable[Any]]
+SyncScriptFunc = Callable[..., Any]
+AsyncScriptFunc = Callable[..., Awaitable[Any]]
 ScriptFunc = SyncScriptFunc | AsyncScriptFunc
 
 
@@ -20,21 +24,14 @@ def unwrap_decorators(func: Any) -> Any:
     return inspect.unwrap(func)
 
 
-@package.command.command(
-    name="script",
-    help="Run a function from a Python module under the script package. Supports both sync and async functions.",
-)
-@package.command.option(
-    "-m",
-    "--module",
-    type=click.STRING,
-    required=True,
-    help="Module path under script.",
-)
-@package.command.argument("function_name", type=click.STRING, required=False, metavar="FUNCTION_NAME")
-async def command(module: str, function_name: str | None) -> None:
+def normalize_module(module: str) -> str:
     if not module.startswith("script.") and module != "script":
         module = "script." + module
+    return module
+
+
+def load_function(module: str, function_name: str | None) -> ScriptFunc:
+    module = normalize_module(module=module)
 
     try:
         import_module: ModuleType = importlib.import_module(module)
@@ -57,8 +54,129 @@ async def command(module: str, function_name: str | None) -> None:
     if func is None:
         available = ", ".join(sorted(func_map.keys())) or "<none>"
         raise CommandException(f"Function '{target_name}' not found in '{module}'. Available: {available}")
+    return func
+
 
+async def run_function(func: ScriptFunc, *args: Any, **kwargs: Any) -> Any:
     if inspect.iscoroutinefunction(func):
-        await cast(AsyncScriptFunc, func)()
+        return await cast(AsyncScriptFunc, func)(*args, **kwargs)
+    return cast(SyncScriptFunc, func)(*args, **kwargs)
+
+
+async def run_stream(
+    func: ScriptFunc,
+    sources: list[str],
+    input_format: RecordFormat,
+    output_format: RecordFormat,
+    batch_size: int,
+    batch_timeout: float | None,
+    chunk_size: int,
+) -> None:
+    origin_func = unwrap_decorators(func=func)
+    if not (inspect.isasyncgenfunction(origin_func) or inspect.iscoroutinefunction(origin_func)):
+        raise CommandException(f"Stream mode needs an async function or async generator, got '{func.__name__}'.")
+
+    records: AsyncIterator[Any]
+    if batch_size > 0:
+        record_chunks = package.stream.read_record_chunks(sources=sources, record_format=input_format, chunk_size=chunk_size)
+        records = package.stream.batched(record_chunks=record_chunks, size=batch_size, timeout=batch_timeout)
     else:
-        cast(SyncScriptFunc, func)()
+        records = package.stream.read_records(sources=sources, record_format=input_format, chunk_size=chunk_size)
+
+    result = func(records)
+    if inspect.isawaitable(result):
+        result = await result
+    if result is None:
+        return
+
+    if not hasattr(result, "__aiter__"):
+        raise CommandException(f"Stream function '{func.__name__}' must return None or an async iterable.")
+    sys.stdout.flush()
+    writer = package.stream.RecordWriter(file=sys.stdout.buffer, record_format=output_format)
+    await package.stream.write_records(records=result, writer=writer, batches=batch_size > 0)
+
+
+@package.command.command(
+    name="script",
+    help=(
+        "Run a function from a Python module under the script package. Supports both sync and async functions. "
+        "With --stream the function receives an async iterator of input records (lists of records with "
+        "--batch-size) and whatever it yields is written to stdout in the same shape."
+    ),
+)
+@package.command.option(
+    "-m",
+    "--module",
+    type=click.STRING,
+    required=True,
+    help="Module path under script.",
+)
+@package.command.option("--stream", is_flag=True, default=False, help="Run the function as a record pipeline.")
+@package.command.option(
+    "-i",
+    "--input",
+    "sources",
+    type=CommandPath(dir_okay=False, allow_dash=True),
+    multiple=True,
+    help="Stream input file, repeatable; '-' reads stdin. [Default: stdin]",
+)
+@package.command.option(
+    "--format",
+    "input_format",
+    type=click.Choice([record_format.value for record_format in RecordFormat]),
+    default=RecordFormat.LINES.value,
+    show_default=True,
+    help="Stream input record format; 'frame' is a 4-byte big-endian length prefix per record.",
+)
+@package.command.option(
+    "--output-format",
+    type=click.Choice([record_format.value for record_format in RecordFormat]),
+    default=None,
+    help="Stream output record format. [Default: --format]",
+)
+@package.command.option(
+    "--batch-size",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Pass lists of up to N records instead of single records; 0 disables batching.",
+)
+@package.command.option(
+    "--batch-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Flush a partial batch after this many milliseconds. [Default: wait for a full batch]",
+)
+@package.command.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=package.stream.DEFAULT_CHUNK_SIZE,
+    show_default=True,
+    help="Stream input read size in bytes.",
+)
+@package.command.argument("function_name", type=click.STRING, required=False, metavar="FUNCTION_NAME")
+async def command(
+    module: str,
+    stream: bool,
+    sources: tuple[str, ...],
+    input_format: str,
+    output_format: str | None,
+    batch_size: int,
+    batch_timeout: float | None,
+    chunk_size: int,
+    function_name: str | None,
+) -> None:
+    func = load_function(module=module, function_name=function_name)
+    if not stream:
+        await run_function(func)
+        return
+
+    await run_stream(
+        func=func,
+        sources=list(sources),
+        input_format=RecordFormat(input_format),
+        output_format=RecordFormat(output_format or input_format),
+        batch_size=batch_size,
+        batch_timeout=batch_timeout / 1000 if batch_timeout is not None else None,
+        chunk_size=chunk_size,
+    )
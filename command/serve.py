@@ -0,0 +1,74 @@
+import asyncio
+import inspect
+import socket
+import tempfile
+from collections.abc import Coroutine
+from pathlib import Path
+from typing import Any
+from typing import cast
+
+import click
+
+import package
+from command import script
+from internal import config
+from package.prefork import Supervisor
+from package.prefork import WorkerTarget
+from package.prefork import create_listener
+
+
+def worker_target(func: script.ScriptFunc) -> WorkerTarget:
+    if not inspect.iscoroutinefunction(func):
+        return cast(WorkerTarget, func)
+
+    def target(sock: socket.socket) -> Any:
+        return asyncio.run(cast(Coroutine[Any, Any, Any], func(sock)))
+
+    return target
+
+
+def exporting_target(target: WorkerTarget, metrics_dir: Path) -> WorkerTarget:
+    # exporters start in each worker after fork; they publish into metrics_dir and export the merged samples
+    def exporting(sock: socket.socket) -> Any:
+        with config.metrics.exporters(shared_dir=metrics_dir):
+            return target(sock)
+
+    return exporting
+
+
+@package.command.command(
+    name="serve",
+    help="Pre-fork workers sharing one listening socket. Each worker runs FUNCTION_NAME(sock) from a script module.",
+)
+@package.command.option(
+    "-m",
+    "--module",
+    type=click.STRING,
+    required=True,
+    help="Module path under script.",
+)
+@package.command.option("--host", type=click.STRING, default="127.0.0.1", show_default=True, help="Listen host.")
+@package.command.option("--port", type=click.INT, default=8000, show_default=True, help="Listen port.")
+@package.command.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker count. [Default: application.supervisor.workers]",
+)
+@package.command.argument("function_name", type=click.STRING, required=False, metavar="FUNCTION_NAME")
+def command(module: str, host: str, port: int, workers: int | None, function_name: str | None) -> None:
+    func = script.load_function(module=module, function_name=function_name)
+    supervisor_config = config.application.supervisor
+
+    with create_listener(host=host, port=port) as sock, tempfile.TemporaryDirectory(prefix="metrics-") as metrics_dir:
+        supervisor = Supervisor(
+            target=exporting_target(target=worker_target(func=func), metrics_dir=Path(metrics_dir)),
+            sock=sock,
+            workers=workers or supervisor_config.worker_count,
+            memory_limit=supervisor_config.worker_memory_limit * 1024 * 1024,
+            backoff=supervisor_config.restart_backoff,
+            backoff_max=supervisor_config.restart_backoff_max,
+            graceful_timeout=supervisor_config.graceful_timeout,
+        )
+        supervisor.run()
@@ -2,8 +2,6 @@ from typing import Any
 from typing import Protocol
 from typing import cast
 
-import IPython
-
 import package
 
 
@@ -13,5 +11,8 @@ class _EmbedFunc(Protocol):
 
 @package.command.command(name="shell", help="Start interactive Python shell")
 def command() -> None:
+    # IPython takes a few hundred milliseconds to import, so only the shell pays for it
+    import IPython
+
     embed = cast(_EmbedFunc, getattr(IPython, "embed"))
     embed(using="asyncio")
@@ -0,0 +1,56 @@
+import functools
+
+import click
+
+import package
+from command import script
+from internal import config
+from package.command import CommandException
+from package.queue import DEFAULT_QUEUE
+from package.queue import Worker
+
+
+@package.command.command(
+    name="worker",
+    help="Run script functions enqueued with package.queue: sync functions on threads, async ones on the loop.",
+)
+@package.command.option(
+    "-q",
+    "--queue",
+    "queue_name",
+    type=click.STRING,
+    default=DEFAULT_QUEUE,
+    show_default=True,
+    help="Queue name.",
+)
+@package.command.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Jobs running at once. [Default: queue.concurrency]",
+)
+@package.command.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Jobs leased per fetch. [Default: queue.batch_size]",
+)
+@package.command.option("--burst", is_flag=True, default=False, help="Exit once no job is ready instead of polling.")
+async def command(queue_name: str, concurrency: int | None, batch_size: int | None, burst: bool) -> None:
+    queue_config = config.queue
+    queue = package.queue.get(name=queue_name)
+    try:
+        worker = Worker(
+            queue=queue,
+            resolve=functools.cache(script.load_function),
+            concurrency=concurrency or queue_config.concurrency,
+            batch_size=batch_size or queue_config.batch_size,
+            poll_interval=queue_config.poll_interval,
+            thread_pool_size=queue_config.thread_pool_size,
+            shutdown_timeout=queue_config.shutdown_timeout,
+            burst=burst,
+        )
+    except ValueError as exc:
+        raise CommandException(str(exc)) from exc
+    with config.metrics.exporters():
+        await worker.run()
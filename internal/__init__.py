@@ -2,14 +2,33 @@ from pathlib import Path
 from typing import Any
 
 from internal.config import Config
+from package.config import get_config_file_path
+
+ConfigStamp = tuple[str, int, int, int]
+
+
+def _config_stamp(config_file_path: Path | None) -> ConfigStamp | None:
+    if config_file_path is None:
+        return None
+    try:
+        stat = config_file_path.stat()
+    except OSError:
+        return None
+    return (str(config_file_path), stat.st_ino, stat.st_size, stat.st_mtime_ns)
 
 
 class ConfigProxy:
     def __init__(self) -> None:
         self._config: Config | None = None
+        self._stamp: ConfigStamp | None = None
 
     def load(self, config_file_path: Path | None = None) -> Config:
+        stamp = _config_stamp(config_file_path=config_file_path or get_config_file_path())
+        if self._config is not None and stamp is not None and stamp == self._stamp:
+            return self._config
+
         self._config = Config.load(config_file_path=config_file_path)
+        self._stamp = stamp
         return self._config
 
     def _require_loaded_config(self) -> Config:
@@ -1,6 +1,24 @@
+import dataclasses
+
 import package
 from internal.config.application import Application
+from internal.config.cache import Cache
+from internal.config.metrics import Metrics
+from internal.config.queue import Queue
+from internal.config.resource import Resource
+from internal.config.schedule import Schedule
 
 
 class Config(package.config.Config):
     application: Application
+    cache: Cache = dataclasses.field(default_factory=Cache)
+    metrics: Metrics = dataclasses.field(default_factory=Metrics)
+    queue: Queue = dataclasses.field(default_factory=Queue)
+    resource: Resource = dataclasses.field(default_factory=Resource)
+    schedule: Schedule = dataclasses.field(default_factory=Schedule)
+
+    def apply(self) -> None:
+        # process-wide wiring kept out of __post_init__ so parsing and validating a config stays side-effect free
+        self.cache.apply()
+        self.queue.apply()
+        self.resource.apply()
@@ -34,12 +34,25 @@ class ApplicationMode(enum.Enum):
     PROD = "prod"
 
 
+class Supervisor(Config):
+    workers: int = dataclasses.field(default=0)  # 0: os.cpu_count()
+    worker_memory_limit: int = dataclasses.field(default=0)  # MiB, 0: unlimited
+    restart_backoff: float = dataclasses.field(default=1.0)
+    restart_backoff_max: float = dataclasses.field(default=30.0)
+    graceful_timeout: float = dataclasses.field(default=30.0)
+
+    @property
+    def worker_count(self) -> int:
+        return self.workers or os.cpu_count() or 1
+
+
 class Application(Config):
     name: str
     mode: ApplicationMode = dataclasses.field(default=ApplicationMode.DEBUG)
     secret: str
     time_zone: TimeZone
     logger: Dict[str, Any]
+    supervisor: Supervisor = dataclasses.field(default_factory=Supervisor)
 
     def __post_init__(self):
         package.logger.config(self.logger)
@@ -0,0 +1,31 @@
+import dataclasses
+
+import package
+from package.config import Config
+from package.config import ConfigValidationError
+
+
+class Cache(Config):
+    path: str = dataclasses.field(default=package.cache.DEFAULT_PATH)  # SQLite file, "" keeps results in memory only
+    max_bytes: int = dataclasses.field(default=package.cache.DEFAULT_MAX_BYTES)  # on-disk size before LRU eviction
+    memory_entries: int = dataclasses.field(default=package.cache.DEFAULT_MEMORY_ENTRIES)  # per cached function
+    ttl: float = dataclasses.field(default=0.0)  # seconds, 0 never expires; @cached(ttl=...) overrides
+
+    def check(self) -> None:
+        errors: list[Exception] = []
+        if self.max_bytes < 1:
+            errors.append(ValueError("cache.max_bytes must be >= 1"))
+        if self.memory_entries < 0:
+            errors.append(ValueError("cache.memory_entries must be >= 0"))
+        if self.ttl < 0:
+            errors.append(ValueError("cache.ttl must be >= 0"))
+        if errors:
+            raise ConfigValidationError(errors)
+
+    def apply(self) -> None:
+        package.cache.configure(
+            path=self.path,
+            max_bytes=self.max_bytes,
+            memory_entries=self.memory_entries,
+            ttl=self.ttl,
+        )
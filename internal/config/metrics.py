@@ -0,0 +1,50 @@
+import contextlib
+import dataclasses
+import logging
+from collections.abc import Generator
+from pathlib import Path
+
+import package
+from package.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class Metrics(Config):
+    file: str = dataclasses.field(default="")  # Prometheus text file, "" disables
+    interval: float = dataclasses.field(default=15.0)  # seconds between file writes
+    host: str = dataclasses.field(default="127.0.0.1")
+    port: int = dataclasses.field(default=0)  # serve GET /metrics, 0 disables
+
+    @contextlib.contextmanager
+    def exporters(self, shared_dir: Path | None = None) -> Generator[None, None, None]:
+        # only long-running commands export; short ones would just bind the port and exit.
+        # Forked workers pass a shared_dir: each publishes its own samples there and exports the merged view, so
+        # no exporter thread runs in the parent across fork() and every worker's metrics are visible.
+        with contextlib.ExitStack() as stack:
+            source: package.metrics.Exposable = package.metrics.registry
+            if shared_dir is not None and (self.file or self.port):
+                group = package.metrics.ProcessGroup(directory=shared_dir)
+                publisher = package.metrics.FileExporter(path=group.path, interval=self.interval)
+                publisher.start()
+                stack.callback(publisher.stop)
+                source = group
+
+            if self.file:
+                file_exporter = package.metrics.FileExporter(
+                    path=Path(self.file), interval=self.interval, metrics_registry=source
+                )
+                file_exporter.start()
+                stack.callback(file_exporter.stop)
+
+            if self.port:
+                try:
+                    http_exporter = package.metrics.HTTPExporter(
+                        host=self.host, port=self.port, metrics_registry=source, reuse_port=shared_dir is not None
+                    )
+                except OSError as exc:
+                    logger.warning("Metrics endpoint %s:%d unavailable: %s", self.host, self.port, exc)
+                else:
+                    http_exporter.start()
+                    stack.callback(http_exporter.stop)
+            yield
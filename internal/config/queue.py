@@ -0,0 +1,38 @@
+import dataclasses
+
+import package
+from package.config import Config
+from package.config import ConfigValidationError
+
+
+class Queue(Config):
+    path: str = dataclasses.field(default=package.queue.DEFAULT_PATH)  # SQLite file shared by producers and workers
+    visibility_timeout: float = dataclasses.field(default=30.0)  # seconds a leased job stays hidden between heartbeats
+    max_attempts: int = dataclasses.field(default=5)
+    retry_backoff: float = dataclasses.field(default=1.0)  # seconds, doubled per attempt
+    retry_backoff_max: float = dataclasses.field(default=300.0)
+    concurrency: int = dataclasses.field(default=8)  # jobs running at once per worker
+    batch_size: int = dataclasses.field(default=32)  # jobs leased per fetch
+    poll_interval: float = dataclasses.field(default=1.0)  # seconds between fetches while idle
+    thread_pool_size: int = dataclasses.field(default=8)  # threads for sync job functions
+    shutdown_timeout: float = dataclasses.field(default=30.0)
+
+    def check(self) -> None:
+        errors: list[Exception] = []
+        if self.visibility_timeout <= 0:
+            errors.append(ValueError("queue.visibility_timeout must be > 0"))
+        if self.max_attempts < 1:
+            errors.append(ValueError("queue.max_attempts must be >= 1"))
+        if self.concurrency < 1 or self.batch_size < 1:
+            errors.append(ValueError("queue.concurrency and queue.batch_size must be >= 1"))
+        if errors:
+            raise ConfigValidationError(errors)
+
+    def apply(self) -> None:
+        package.queue.configure(
+            path=self.path,
+            visibility_timeout=self.visibility_timeout,
+            max_attempts=self.max_attempts,
+            retry_backoff=self.retry_backoff,
+            retry_backoff_max=self.retry_backoff_max,
+        )
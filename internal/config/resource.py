@@ -0,0 +1,27 @@
+import dataclasses
+import functools
+
+import package
+from package.config import Config
+from package.resource import PoolConfig
+from package.resource import SQLitePoolConfig
+from package.resource import UnixSocketPoolConfig
+
+
+class Resource(Config):
+    sqlite: dict[str, SQLitePoolConfig] = dataclasses.field(default_factory=dict[str, SQLitePoolConfig])
+    unix_socket: dict[str, UnixSocketPoolConfig] = dataclasses.field(default_factory=dict[str, UnixSocketPoolConfig])
+
+    @property
+    def pools(self) -> dict[str, PoolConfig]:
+        return {**self.sqlite, **self.unix_socket}
+
+    def check(self) -> None:
+        duplicates = sorted(self.sqlite.keys() & self.unix_socket.keys())
+        if duplicates:
+            raise ValueError(f"resource names must be unique: {', '.join(duplicates)}")
+
+    def apply(self) -> None:
+        # register lazy factories; pools are created on first acquire
+        for name, pool_config in self.pools.items():
+            package.resource.registry.register(name, functools.partial(pool_config.create_pool, name))
@@ -0,0 +1,20 @@
+import dataclasses
+
+from package.config import Config
+
+
+class Job(Config):
+    name: str
+    module: str
+    function: str = dataclasses.field(default="main")
+    interval: float | None = dataclasses.field(default=None)  # seconds
+    cron: str | None = dataclasses.field(default=None)  # "minute hour day month weekday"
+    jitter: float = dataclasses.field(default=0.0)  # seconds
+    enabled: bool = dataclasses.field(default=True)
+
+
+class Schedule(Config):
+    jobs: list[Job] = dataclasses.field(default_factory=list[Job])
+    thread_pool_size: int = dataclasses.field(default=8)
+    report_interval: float = dataclasses.field(default=60.0)
+    shutdown_timeout: float = dataclasses.field(default=30.0)
@@ -1,4 +1,15 @@
-import command
+import sys
+
+from package import daemon
+
+# root group options that take a value; kept here so the thin client does not import click
+ROOT_VALUE_OPTIONS = ("-c", "--config", "--profile", "--profile-dir", "--profile-top")
 
 if __name__ == "__main__":
+    exit_code = daemon.forward(argv=sys.argv[1:], value_options=ROOT_VALUE_OPTIONS)
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    import command
+
     command.execute()
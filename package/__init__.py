@@ -1,5 +1,43 @@
-from package import command
-from package import config
-from package import logger
+import importlib
+from typing import TYPE_CHECKING
+from typing import Any
 
-__all__ = ["command", "config", "logger"]
+if TYPE_CHECKING:
+    from package import bench
+    from package import cache
+    from package import command
+    from package import config
+    from package import daemon
+    from package import logger
+    from package import metrics
+    from package import prefork
+    from package import profiler
+    from package import queue
+    from package import resource
+    from package import scheduler
+    from package import stream
+    from package import validation
+
+__all__ = [
+    "bench",
+    "cache",
+    "command",
+    "config",
+    "daemon",
+    "logger",
+    "metrics",
+    "prefork",
+    "profiler",
+    "queue",
+    "resource",
+    "scheduler",
+    "stream",
+    "validation",
+]
+
+
+def __getattr__(name: str) -> Any:
+    # Submodules load on first access so thin entry points (daemon client) skip click/asyncio imports.
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,188 @@
+import dataclasses
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+from typing import cast
+
+BenchFunc = Callable[[], Any]
+
+
+@dataclasses.dataclass(frozen=True)
+class Case:
+    name: str
+    func: BenchFunc
+    number: int = 1
+    repeat: int | None = None
+    setup: Callable[[], Any] | None = None
+    teardown: Callable[[], Any] | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class Result:
+    name: str
+    number: int
+    samples: list[float]
+
+    @property
+    def min(self) -> float:
+        return min(self.samples)
+
+    @property
+    def max(self) -> float:
+        return max(self.samples)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0
+
+    @property
+    def p95(self) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.95) - 1)]
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1.0 / self.median if self.median > 0 else math.inf
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "number": self.number,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "median": self.median,
+            "stdev": self.stdev,
+            "p95": self.p95,
+            "samples": self.samples,
+        }
+
+
+@dataclasses.dataclass(frozen=True)
+class Regression:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline * 100
+
+
+def run_case(case: Case, warmup: int, repeat: int) -> Result:
+    if case.setup is not None:
+        case.setup()
+    try:
+        for _ in range(warmup):
+            _time(case.func, case.number)
+
+        samples: list[float] = []
+        for _ in range(case.repeat or repeat):
+            samples.append(_time(case.func, case.number) / case.number)
+        return Result(name=case.name, number=case.number, samples=samples)
+    finally:
+        if case.teardown is not None:
+            case.teardown()
+
+
+def _time(func: BenchFunc, number: int) -> float:
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started_at = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - started_at
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def run(cases: Iterable[Case], warmup: int, repeat: int, report: Callable[[Result], Any] | None = None) -> list[Result]:
+    results: list[Result] = []
+    for case in cases:
+        result = run_case(case=case, warmup=warmup, repeat=repeat)
+        results.append(result)
+        if report is not None:
+            report(result)
+    return results
+
+
+def to_document(results: list[Result]) -> dict[str, Any]:
+    return {
+        "meta": {
+            "python": sys.version,
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": {result.name: result.to_dict() for result in results},
+    }
+
+
+def write(path: Path, results: list[Result]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(to_document(results=results), indent=2) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> dict[str, float]:
+    document = cast(dict[str, Any], json.loads(path.read_text(encoding="utf-8")))
+    results = cast(dict[str, dict[str, Any]], document.get("results", {}))
+    return {name: float(result["median"]) for name, result in results.items()}
+
+
+def compare(results: list[Result], baseline: dict[str, float], threshold: float) -> list[Regression]:
+    regressions: list[Regression] = []
+    for result in results:
+        baseline_median = baseline.get(result.name)
+        if baseline_median is None or baseline_median <= 0:
+            continue
+        regression = Regression(name=result.name, baseline=baseline_median, current=result.median)
+        if regression.change > threshold:
+            regressions.append(regression)
+    return regressions
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f}{unit}"
+    return f"{seconds / 1e-9:.1f}ns"
+
+
+def format_result(result: Result) -> str:
+    return (
+        f"{result.name:<40} median {format_seconds(result.median):>10}  p95 {format_seconds(result.p95):>10}  "
+        f"stdev {format_seconds(result.stdev):>10}  {result.ops_per_second:>14,.1f} ops/s"
+    )
+
+
+__all__ = [
+    "BenchFunc",
+    "Case",
+    "Regression",
+    "Result",
+    "compare",
+    "format_result",
+    "format_seconds",
+    "load_baseline",
+    "run",
+    "run_case",
+    "write",
+]
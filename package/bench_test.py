@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from package.bench import Case
+from package.bench import Result
+from package.bench import compare
+from package.bench import load_baseline
+from package.bench import run_case
+from package.bench import write
+
+
+class BenchTests(unittest.TestCase):
+    def test_run_case_statistics(self) -> None:
+        calls: list[int] = []
+        result = run_case(Case(name="append", func=lambda: calls.append(1), number=10), warmup=2, repeat=5)
+        self.assertEqual(len(calls), 70)
+        self.assertEqual(len(result.samples), 5)
+        self.assertLessEqual(result.min, result.median)
+        self.assertLessEqual(result.median, result.p95)
+        self.assertLessEqual(result.p95, result.max)
+
+    def test_compare_against_baseline(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            baseline_path = Path(temp_dir) / "baseline.json"
+            write(baseline_path, [Result(name="a", number=1, samples=[1.0, 1.0]), Result(name="b", number=1, samples=[1.0])])
+            baseline = load_baseline(baseline_path)
+
+        current = [
+            Result(name="a", number=1, samples=[1.05, 1.05]),
+            Result(name="b", number=1, samples=[1.5]),
+            Result(name="c", number=1, samples=[9.0]),
+        ]
+        regressions = compare(results=current, baseline=baseline, threshold=10.0)
+        self.assertEqual([regression.name for regression in regressions], ["b"])
+        self.assertAlmostEqual(regressions[0].change, 50.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
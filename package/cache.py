@@ -0,0 +1,538 @@
+import asyncio
+import atexit
+import dataclasses
+import datetime
+import enum
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any
+from typing import Final
+from typing import ParamSpec
+from typing import Protocol
+from typing import TypeVar
+from typing import cast
+from typing import overload
+
+from package import metrics
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+R_co = TypeVar("R_co", covariant=True)
+
+DEFAULT_PATH: Final = ".cache/memo.sqlite3"
+DEFAULT_MAX_BYTES: Final = 256 << 20
+DEFAULT_MEMORY_ENTRIES: Final = 256
+KEY_VERSION: Final = 1
+# evict down to this fraction of max_bytes so a full store does not evict on every put
+_EVICT_TARGET: Final = 0.9
+_EVICT_BATCH: Final = 256
+
+CACHE_REQUESTS = metrics.counter("cache_requests_total", "Memoized calls by lookup result.", ("cache", "result"))
+CACHE_EVICTIONS = metrics.counter("cache_evictions_total", "Memoized entries evicted.", ("cache", "tier"))
+
+_SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS memo (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS memo_accessed_at ON memo (accessed_at);
+"""
+
+
+def _encode(value: Any, out: bytearray) -> None:
+    # type tag + length prefixes keep distinct values from colliding, e.g. ("a", "b") vs ("ab",)
+    if value is None or isinstance(value, bool):
+        out += b"N" if value is None else (b"T" if value else b"F")
+    elif isinstance(value, enum.Enum):
+        out += b"E"
+        _encode(f"{type(value).__module__}.{type(value).__qualname__}", out)
+        _encode(value.value, out)
+    elif isinstance(value, int):
+        data = str(value).encode()
+        out += b"I" + struct.pack("!I", len(data)) + data
+    elif isinstance(value, float):
+        out += b"D" + struct.pack("!d", value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8", "surrogatepass")
+        out += b"S" + struct.pack("!I", len(data)) + data
+    elif isinstance(value, bytes | bytearray):
+        out += b"B" + struct.pack("!I", len(value)) + value
+    elif isinstance(value, tuple | list):
+        sequence = cast(tuple[Any, ...] | list[Any], value)
+        out += (b"L" if isinstance(sequence, list) else b"U") + struct.pack("!I", len(sequence))
+        for item in sequence:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        items = sorted(_encoded(key, item) for key, item in cast(dict[Any, Any], value).items())
+        out += b"M" + struct.pack("!I", len(items)) + b"".join(items)
+    elif isinstance(value, set | frozenset):
+        items = sorted(_encoded(item) for item in cast(set[Any], value))
+        out += b"X" + struct.pack("!I", len(items)) + b"".join(items)
+    elif isinstance(value, datetime.date | datetime.time | datetime.timedelta):
+        _encode(f"{type(value).__qualname__}:{value!r}", out)
+    elif isinstance(value, Path):
+        out += b"P"
+        _encode(str(value), out)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        out += b"C"
+        _encode(f"{type(value).__module__}.{type(value).__qualname__}", out)
+        _encode({field.name: getattr(value, field.name) for field in dataclasses.fields(value)}, out)
+    else:
+        raise TypeError(f"Cannot build a stable cache key from {type(value).__qualname__}.")
+
+
+def _encoded(*values: Any) -> bytes:
+    out = bytearray()
+    for value in values:
+        _encode(value, out)
+    return bytes(out)
+
+
+def stable_hash(*parts: Any) -> str:
+    out = bytearray()
+    _encode(parts, out)
+    return hashlib.sha256(out).hexdigest()
+
+
+@dataclasses.dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    waits: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+@dataclasses.dataclass
+class DiskStats:
+    entries: int = 0
+    size_bytes: int = 0
+    evictions: int = 0
+
+
+class DiskStore:
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES, busy_timeout: float = 5.0) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid = 0
+        self._size = 0
+        self._evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # a forked child must not share the parent's sqlite handle
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self._busy_timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=wal")
+            connection.execute("PRAGMA synchronous=normal")
+            connection.executescript(_SCHEMA)
+            self._size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM memo").fetchone()[0]
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, namespace: str, key: str) -> tuple[bool, Any, float | None]:
+        # returns (found, value, expires_at) so a copy kept elsewhere expires with the stored entry
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value, expires_at FROM memo WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return False, None, None
+            data, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                connection.execute("DELETE FROM memo WHERE namespace = ? AND key = ?", (namespace, key))
+                return False, None, None
+            connection.execute("UPDATE memo SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+        try:
+            return True, pickle.loads(data), expires_at
+        except Exception:
+            logger.warning("Dropping unreadable cache entry %s/%s.", namespace, key, exc_info=True)
+            self.delete(namespace=namespace, key=key)
+            return False, None, None
+
+    def put(self, namespace: str, key: str, value: Any, expires_at: float | None) -> None:
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as exc:
+            logger.warning("Not persisting %s result: %s", namespace, exc)
+            return
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO memo (namespace, key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, data, len(data), expires_at, time.time()),
+            )
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict_locked(connection)
+
+    def _evict_locked(self, connection: sqlite3.Connection) -> None:
+        # other processes share the file, so resync the size before deciding what to drop
+        connection.execute("DELETE FROM memo WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM memo").fetchone()[0]
+        target = int(self.max_bytes * _EVICT_TARGET)
+        evicted: dict[str, int] = {}
+        while size > target:
+            rows = connection.execute(
+                "SELECT rowid, namespace, size FROM memo ORDER BY accessed_at LIMIT ?", (_EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            dropped: list[tuple[int]] = []
+            for rowid, namespace, row_size in rows:
+                dropped.append((rowid,))
+                evicted[namespace] = evicted.get(namespace, 0) + 1
+                size -= row_size
+                if size <= target:
+                    break
+            connection.executemany("DELETE FROM memo WHERE rowid = ?", dropped)
+        self._size = size
+        for namespace, count in evicted.items():
+            self._evictions += count
+            CACHE_EVICTIONS.labels(namespace, "disk").inc(count)
+
+    def delete(self, namespace: str, key: str | None = None) -> None:
+        with self._lock:
+            connection = self._connect()
+            if key is None:
+                connection.execute("DELETE FROM memo WHERE namespace = ?", (namespace,))
+            else:
+                connection.execute("DELETE FROM memo WHERE namespace = ? AND key = ?", (namespace, key))
+            self._size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM memo").fetchone()[0]
+
+    def stats(self) -> DiskStats:
+        with self._lock:
+            entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM memo").fetchone()
+            return DiskStats(entries=entries, size_bytes=size, evictions=self._evictions)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+@dataclasses.dataclass(frozen=True)
+class Settings:
+    path: str = DEFAULT_PATH
+    max_bytes: int = DEFAULT_MAX_BYTES
+    memory_entries: int = DEFAULT_MEMORY_ENTRIES
+    ttl: float = 0.0
+
+
+_settings = Settings()
+_store: DiskStore | None = None
+_store_lock = threading.Lock()
+
+
+def configure(
+    path: str = DEFAULT_PATH,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ttl: float = 0.0,
+) -> None:
+    global _settings, _store
+    settings = Settings(path=path, max_bytes=max_bytes, memory_entries=memory_entries, ttl=ttl)
+    with _store_lock:
+        if settings == _settings:
+            return
+        if _store is not None and (settings.path != _settings.path or settings.max_bytes != _settings.max_bytes):
+            _store.close()
+            _store = None
+        _settings = settings
+
+
+def default_store() -> DiskStore | None:
+    global _store
+    if not _settings.path:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = DiskStore(path=Path(_settings.path), max_bytes=_settings.max_bytes)
+        return _store
+
+
+def close() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+
+
+atexit.register(close)
+
+
+class Memo:
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        *,
+        ttl: float | None,
+        memory_entries: int | None,
+        namespace: str | None,
+        version: str,
+        store: DiskStore | None,
+        persist: bool,
+    ) -> None:
+        self.namespace = namespace or f"{func.__module__}.{func.__qualname__}"
+        self._signature = inspect.signature(func)
+        self._ttl = ttl
+        self._memory_entries = memory_entries
+        self._version = version
+        self._store = store
+        self._persist = persist
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[Any, float | None]] = OrderedDict()
+        self._inflight: dict[str, Future[Any]] = {}
+        self._stats = CacheStats()
+        self._hit = CACHE_REQUESTS.labels(self.namespace, "hit")
+        self._disk_hit = CACHE_REQUESTS.labels(self.namespace, "disk_hit")
+        self._miss = CACHE_REQUESTS.labels(self.namespace, "miss")
+        self._wait = CACHE_REQUESTS.labels(self.namespace, "wait")
+        self._evicted = CACHE_EVICTIONS.labels(self.namespace, "memory")
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return dataclasses.replace(self._stats, size=len(self._memory))
+
+    @property
+    def store(self) -> DiskStore | None:
+        if not self._persist:
+            return None
+        return self._store if self._store is not None else default_store()
+
+    def key(self, args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+        # bind so f(1), f(x=1) and f(1, default) share one entry
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return stable_hash(KEY_VERSION, self._version, tuple(bound.arguments.items()))
+
+    def _expires_at(self) -> float | None:
+        ttl = self._ttl if self._ttl is not None else _settings.ttl
+        return time.time() + ttl if ttl > 0 else None
+
+    def lookup(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._memory.move_to_end(key)
+                    self._stats.hits += 1
+                    self._hit.inc()
+                    return True, value
+                del self._memory[key]
+        return False, None
+
+    def join(self, key: str) -> tuple[Future[Any], bool]:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats.waits += 1
+                self._wait.inc()
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def load(self, key: str) -> tuple[bool, Any]:
+        store = self.store
+        if store is None:
+            return False, None
+        found, value, expires_at = store.get(namespace=self.namespace, key=key)
+        if found:
+            with self._lock:
+                self._stats.disk_hits += 1
+            self._disk_hit.inc()
+            # the memory copy expires with the disk entry, not one ttl after this hit
+            self.remember(key=key, value=value, expires_at=expires_at)
+        return found, value
+
+    def save(self, key: str, value: Any) -> None:
+        expires_at = self._expires_at()
+        self.remember(key=key, value=value, expires_at=expires_at)
+        store = self.store
+        if store is not None:
+            store.put(namespace=self.namespace, key=key, value=value, expires_at=expires_at)
+
+    def remember(self, key: str, value: Any, expires_at: float | None) -> None:
+        limit = self._memory_entries if self._memory_entries is not None else _settings.memory_entries
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > limit:
+                self._memory.popitem(last=False)
+                self._stats.evictions += 1
+                self._evicted.inc()
+
+    def miss(self) -> None:
+        with self._lock:
+            self._stats.misses += 1
+        self._miss.inc()
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        store = self.store
+        if store is not None:
+            store.delete(namespace=self.namespace)
+
+
+def _sync_wrapper(func: Callable[..., Any], memo: Memo) -> Callable[..., Any]:
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = memo.key(args=args, kwargs=kwargs)
+        found, value = memo.lookup(key=key)
+        if found:
+            return value
+
+        future, owner = memo.join(key=key)
+        if not owner:
+            return future.result()
+        try:
+            found, value = memo.load(key=key)
+            if not found:
+                memo.miss()
+                value = func(*args, **kwargs)
+                memo.save(key=key, value=value)
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            memo.release(key=key)
+
+    return wrapper
+
+
+def _async_wrapper(func: Callable[..., Any], memo: Memo) -> Callable[..., Any]:
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = memo.key(args=args, kwargs=kwargs)
+        found, value = memo.lookup(key=key)
+        if found:
+            return value
+
+        future, owner = memo.join(key=key)
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            # sqlite calls block, keep them off the event loop
+            found, value = await asyncio.to_thread(memo.load, key)
+            if not found:
+                memo.miss()
+                value = await func(*args, **kwargs)
+                await asyncio.to_thread(memo.save, key, value)
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            memo.release(key=key)
+
+    return wrapper
+
+
+class CachedFunction(Protocol[P, R_co]):
+    cache: Memo
+
+    def __call__(self, *args: P.args, **kwargs: P.kwargs) -> R_co: ...
+
+
+@overload
+def cached(func: Callable[P, R]) -> CachedFunction[P, R]: ...
+
+
+@overload
+def cached(
+    func: None = None,
+    *,
+    ttl: float | None = None,
+    memory_entries: int | None = None,
+    namespace: str | None = None,
+    version: str = "",
+    store: DiskStore | None = None,
+    persist: bool = True,
+) -> Callable[[Callable[P, R]], CachedFunction[P, R]]: ...
+
+
+def cached(
+    func: Callable[P, R] | None = None,
+    *,
+    ttl: float | None = None,
+    memory_entries: int | None = None,
+    namespace: str | None = None,
+    version: str = "",
+    store: DiskStore | None = None,
+    persist: bool = True,
+) -> CachedFunction[P, R] | Callable[[Callable[P, R]], CachedFunction[P, R]]:
+    def decorator(func: Callable[P, R]) -> CachedFunction[P, R]:
+        memo = Memo(
+            func,
+            ttl=ttl,
+            memory_entries=memory_entries,
+            namespace=namespace,
+            version=version,
+            store=store,
+            persist=persist,
+        )
+        if inspect.iscoroutinefunction(func):
+            wrapper = _async_wrapper(func=func, memo=memo)
+        else:
+            wrapper = _sync_wrapper(func=func, memo=memo)
+        setattr(wrapper, "cache", memo)
+        return cast(CachedFunction[P, R], wrapper)
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+__all__ = [
+    "CacheStats",
+    "CachedFunction",
+    "DiskStats",
+    "DiskStore",
+    "Memo",
+    "cached",
+    "close",
+    "configure",
+    "default_store",
+    "stable_hash",
+]
@@ -0,0 +1,183 @@
+import asyncio
+import dataclasses
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from package.cache import DiskStore
+from package.cache import cached
+from package.cache import stable_hash
+
+
+@dataclasses.dataclass(frozen=True)
+class Point:
+    x: int
+    y: int
+
+
+class StableHashTests(unittest.TestCase):
+    def test_stable_and_distinct(self) -> None:
+        self.assertEqual(stable_hash({"b": 1, "a": {2, 1}}), stable_hash({"a": {1, 2}, "b": 1}))
+        self.assertEqual(stable_hash(Point(1, 2)), stable_hash(Point(1, 2)))
+        self.assertEqual(
+            stable_hash("x", 1, 2.5, None, b"y"),
+            "8d87295b04d4eee1a462f22e17414da7aaee476fc05d9eb0a8d1e5aa0c89abbf",
+        )
+        distinct = [("a", "b"), ("ab",), [("a", "b")], 1, 1.0, True, "1", b"1", Point(1, 2), Point(2, 1)]
+        self.assertEqual(len({stable_hash(value) for value in distinct}), len(distinct))
+
+    def test_unsupported(self) -> None:
+        with self.assertRaises(TypeError):
+            stable_hash(object())
+
+
+class CachedTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.store = DiskStore(path=Path(temp_dir.name) / "memo.sqlite3", max_bytes=1 << 20)
+        self.addCleanup(self.store.close)
+
+    def test_tiers(self) -> None:
+        calls: list[int] = []
+
+        def square(value: int, offset: int = 0) -> int:
+            calls.append(value)
+            return value * value + offset
+
+        first = cached(store=self.store, namespace="square")(square)
+        self.assertEqual(first(3), 9)
+        self.assertEqual(first(value=3, offset=0), 9)
+        self.assertEqual(calls, [3])
+        self.assertEqual((first.cache.stats.hits, first.cache.stats.misses), (1, 1))
+
+        # a new process-local wrapper starts with an empty memory tier and reads from disk
+        second = cached(store=self.store, namespace="square")(square)
+        self.assertEqual(second(3), 9)
+        self.assertEqual(calls, [3])
+        self.assertEqual(second.cache.stats.disk_hits, 1)
+
+        second.cache.clear()
+        third = cached(store=self.store, namespace="square")(square)
+        self.assertEqual(third(3), 9)
+        self.assertEqual(calls, [3, 3])
+
+    def test_ttl_and_memory_eviction(self) -> None:
+        calls: list[int] = []
+
+        @cached(store=self.store, ttl=0.05, memory_entries=2)
+        def identity(value: int) -> int:
+            calls.append(value)
+            return value
+
+        for value in (1, 2, 3, 1):
+            identity(value)
+        self.assertEqual(identity.cache.stats.evictions, 2)
+        self.assertEqual(identity.cache.stats.disk_hits, 1)
+        self.assertEqual(calls, [1, 2, 3])
+
+        time.sleep(0.1)
+        identity(1)
+        self.assertEqual(calls, [1, 2, 3, 1])
+
+    def test_disk_hit_keeps_stored_expiry(self) -> None:
+        calls: list[int] = []
+
+        def identity(value: int) -> int:
+            calls.append(value)
+            return value
+
+        cached(store=self.store, namespace="identity", ttl=0.2)(identity)(1)
+        time.sleep(0.1)
+        # a fresh memory tier copies the entry from disk half way through its ttl
+        second = cached(store=self.store, namespace="identity", ttl=0.2)(identity)
+        second(1)
+        self.assertEqual((calls, second.cache.stats.disk_hits), ([1], 1))
+
+        time.sleep(0.15)
+        second(1)
+        self.assertEqual(calls, [1, 1])
+
+    def test_disk_eviction(self) -> None:
+        store = DiskStore(path=self.store.path.with_name("small.sqlite3"), max_bytes=10_000)
+        self.addCleanup(store.close)
+
+        @cached(store=store, memory_entries=0)
+        def blob(value: int) -> bytes:
+            return bytes(1_000)
+
+        for value in range(30):
+            blob(value)
+        stats = store.stats()
+        self.assertLessEqual(stats.size_bytes, 10_000)
+        self.assertGreater(stats.evictions, 0)
+
+    def test_single_flight_threads(self) -> None:
+        calls: list[int] = []
+        started = threading.Barrier(8)
+
+        @cached(store=self.store)
+        def slow(value: int) -> int:
+            calls.append(value)
+            time.sleep(0.1)
+            return value
+
+        def call() -> None:
+            started.wait()
+            slow(7)
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(calls, [7])
+        self.assertEqual(slow.cache.stats.waits, 7)
+
+    def test_single_flight_async_and_errors(self) -> None:
+        calls: list[int] = []
+
+        @cached(store=self.store)
+        async def fetch(value: int) -> int:
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            if value < 0:
+                raise ValueError(value)
+            return value * 2
+
+        async def run() -> list[int | BaseException]:
+            return await asyncio.gather(*(fetch(5) for _ in range(5)), fetch(-1), fetch(-1), return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertEqual(results[:5], [10] * 5)
+        self.assertIsInstance(results[5], ValueError)
+        self.assertIsInstance(results[6], ValueError)
+        self.assertEqual(sorted(calls), [-1, 5])
+        # failures are not cached
+        self.assertIsInstance(asyncio.run(run())[5], ValueError)
+        self.assertEqual(sorted(calls), [-1, -1, 5])
+
+
+class CacheConfigTests(unittest.TestCase):
+    def test_checks_run_in_validation_mode_without_configure(self) -> None:
+        from internal.config.cache import Cache
+
+        with mock.patch("package.cache.configure") as configure:
+            errors = Cache.validate({"max_bytes": 0, "memory_entries": -1, "ttl": -1.0})
+            self.assertEqual(
+                [str(error) for error in errors],
+                ["cache.max_bytes must be >= 1", "cache.memory_entries must be >= 0", "cache.ttl must be >= 0"],
+            )
+            self.assertEqual(Cache.validate({"path": "", "ttl": 5}), [])
+            config = Cache.from_mapping({"path": "", "ttl": 5})
+            configure.assert_not_called()
+
+            config.apply()
+        configure.assert_called_once_with(path="", max_bytes=config.max_bytes, memory_entries=config.memory_entries, ttl=5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
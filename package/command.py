@@ -1,5 +1,6 @@
 import asyncio
 import functools
+import importlib
 import inspect
 from collections.abc import Callable
 from collections.abc import Coroutine
@@ -11,6 +12,7 @@ from typing import overload
 from click import ClickException as CommandException
 from click import Command
 from click import Context as CommandContext
+from click import Group
 from click import Option as CommandOption
 from click import Path as CommandPath
 from click import argument
@@ -88,8 +90,26 @@ def command(
     return wrapped
 
 
+class LazyGroup(Group):
+    # subcommands map to "module" paths exposing `command`; a module is imported only when its command runs
+    def __init__(self, *args: Any, lazy_subcommands: dict[str, str] | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: CommandContext) -> list[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_subcommands})
+
+    def get_command(self, ctx: CommandContext, cmd_name: str) -> Command | None:
+        module_name = self.lazy_subcommands.get(cmd_name)
+        if module_name is None:
+            return super().get_command(ctx, cmd_name)
+        return cast(Command, getattr(importlib.import_module(module_name), "command"))
+
+
 __all__ = [
     "CommandException",
+    "Group",
+    "LazyGroup",
     "argument",
     "command",
     "echo",
@@ -4,6 +4,7 @@ import os
 import sys
 import tomllib
 from collections.abc import Mapping
+from contextvars import ContextVar
 from functools import lru_cache
 from pathlib import Path
 from types import UnionType
@@ -18,13 +19,18 @@ from typing import get_args
 from typing import get_origin
 from typing import get_type_hints
 
-from package.command import CommandContext
 from package.command import CommandException
-from package.command import CommandOption
 
 CONFIG_ENV_VAR: Final = "CONFIG_FILE_PATH"
 DEFAULT_CONFIG_FILE_PATH: Final = Path("config.toml")
 _MISSING: Final = object()
+_VALIDATING: ContextVar[bool] = ContextVar("config_validating", default=False)
+
+
+class ConfigValidationError(ValueError):
+    def __init__(self, errors: list[Exception]) -> None:
+        self.errors = errors
+        super().__init__("\n".join(str(error) for error in errors))
 
 
 def _type_error(config_key: str, expected_type: Any) -> TypeError:
@@ -50,7 +56,7 @@ def _load_toml(path: Path) -> dict[str, Any]:
         raise ValueError(f"Config file is not valid TOML: {path}") from exc
 
 
-def normalize_config_file_path(_: CommandContext, __: CommandOption, value: Path | None) -> Path | None:
+def normalize_config_file_path(value: Path | None) -> Path | None:
     if value is None:
         return None
 
@@ -181,9 +187,12 @@ def _coerce_value(value: Any, annotation: Any, config_key: str) -> Any:
     if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
         return _coerce_enum(value=value, annotation=annotation, config_key=config_key)
 
-    if annotation is int and isinstance(value, bool):
+    if annotation in (int, float) and isinstance(value, bool):
         raise _type_error(config_key, annotation)
 
+    if annotation is float and isinstance(value, int):
+        return float(value)
+
     if origin_type is list:
         return _coerce_list(value=value, annotation=annotation, config_key=config_key)
 
@@ -206,7 +215,11 @@ def _default_value(field: dataclasses.Field[Any], config_key: str) -> Any:
     if field.default is not dataclasses.MISSING:
         return field.default
     if field.default_factory is not dataclasses.MISSING:
-        return field.default_factory()
+        factory = field.default_factory
+        if isinstance(factory, type) and issubclass(factory, Config):
+            # nested configs are built like configured ones, so validation mode skips their __post_init__ too
+            return factory.from_mapping(config_data={}, parent_key=config_key)
+        return factory()
     raise ValueError(f"{config_key} must be set.")
 
 
@@ -236,15 +249,25 @@ class Config(metaclass=ConfigMeta):
         if not dataclasses.is_dataclass(cls):
             raise ValueError(f"config class({cls.__qualname__}) is not a dataclass")
 
+        # In validation mode every error is collected and __post_init__ side effects are skipped; check() still runs.
+        validating = _VALIDATING.get()
+        errors: list[Exception] = []
+
         for key in cast(Mapping[Any, Any], config_data):
             if not isinstance(key, str):
-                raise TypeError(f"{parent_key or '<root>'} contains non-string key: {key!r}")
+                error = TypeError(f"{parent_key or '<root>'} contains non-string key: {key!r}")
+                if not validating:
+                    raise error
+                errors.append(error)
 
         field_names = {field.name for field in dataclasses.fields(cls)}
         unknown_fields = [key for key in config_data if key not in field_names]
         if unknown_fields:
-            unknown_fields_str = ", ".join(sorted(unknown_fields))
-            raise ValueError(f"{parent_key or '<root>'} contains unknown fields: {unknown_fields_str}")
+            unknown_fields_str = ", ".join(sorted(map(str, unknown_fields)))
+            error = ValueError(f"{parent_key or '<root>'} contains unknown fields: {unknown_fields_str}")
+            if not validating:
+                raise error
+            errors.append(error)
 
         values: dict[str, Any] = {}
         type_hints = cls._cached_type_hints(cls)
@@ -254,13 +277,58 @@ class Config(metaclass=ConfigMeta):
             annotation = type_hints.get(field.name, Any)
             raw_value = config_data.get(field.name, _MISSING)
 
-            if raw_value is _MISSING:
-                values[field.name] = _default_value(field=field, config_key=config_key)
-                continue
+            try:
+                if raw_value is _MISSING:
+                    values[field.name] = _default_value(field=field, config_key=config_key)
+                    continue
+
+                values[field.name] = _coerce_value(value=raw_value, annotation=annotation, config_key=config_key)
+            except ConfigValidationError as exc:
+                if not validating:
+                    raise
+                errors.extend(exc.errors)
+            except (TypeError, ValueError) as exc:
+                if not validating:
+                    raise
+                errors.append(exc)
+
+        if errors:
+            raise ConfigValidationError(errors)
+
+        # check() runs on an instance that skipped __init__, so a failing check never reaches __post_init__
+        checked = object.__new__(cls)
+        for name, value in values.items():
+            object.__setattr__(checked, name, value)
+        try:
+            checked.check()
+        except ConfigValidationError:
+            # a check that collects several errors reports each of them
+            raise
+        except (TypeError, ValueError) as exc:
+            if not validating:
+                raise
+            raise ConfigValidationError([exc]) from exc
+
+        if validating:
+            return checked
+        return cls(**values)
 
-            values[field.name] = _coerce_value(value=raw_value, annotation=annotation, config_key=config_key)
+    def check(self) -> None:
+        # side-effect-free checks across fields; from_mapping runs them before __post_init__, also when validating
+        pass
 
-        return cls(**values)
+    @classmethod
+    def validate(cls, config_data: Mapping[str, Any]) -> list[Exception]:
+        token = _VALIDATING.set(True)
+        try:
+            cls.from_mapping(config_data=config_data)
+        except ConfigValidationError as exc:
+            return exc.errors
+        except (TypeError, ValueError) as exc:
+            return [exc]
+        finally:
+            _VALIDATING.reset(token)
+        return []
 
     @classmethod
     def load(cls: type[C], config_file_path: Path | None = None) -> C:
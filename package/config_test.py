@@ -1,3 +1,4 @@
+import dataclasses
 import os
 import tempfile
 import unittest
@@ -32,6 +33,37 @@ class UnionValueConfig(Config):
     value: ChildConfig | str
 
 
+class FloatConfig(Config):
+    interval: float | None
+
+
+POST_INIT_CALLS: list[str] = []
+
+
+class SideEffectConfig(Config):
+    name: str
+
+    def check(self) -> None:
+        if not self.name:
+            raise ValueError("name must not be empty")
+
+    def __post_init__(self) -> None:
+        POST_INIT_CALLS.append(self.name)
+
+
+class SideEffectRootConfig(Config):
+    child: SideEffectConfig
+    retries: int
+
+
+class DefaultedSideEffectConfig(SideEffectConfig):
+    name: str = "default"
+
+
+class DefaultedSideEffectRootConfig(Config):
+    child: DefaultedSideEffectConfig = dataclasses.field(default_factory=DefaultedSideEffectConfig)
+
+
 class ConfigTests(unittest.TestCase):
     def test_from_mapping_success(self) -> None:
         cfg = RootConfig.from_mapping(
@@ -91,6 +123,14 @@ class ConfigTests(unittest.TestCase):
         with self.assertRaises(TypeError):
             IntOnlyConfig.from_mapping({"retries": True})
 
+    def test_int_widens_to_float(self) -> None:
+        cfg = FloatConfig.from_mapping({"interval": 5})
+        self.assertIsInstance(cfg.interval, float)
+        self.assertEqual(cfg.interval, 5.0)
+
+        with self.assertRaises(TypeError):
+            FloatConfig.from_mapping({"interval": True})
+
     def test_reject_non_string_mapping_key(self) -> None:
         payload = cast(
             Mapping[str, object],
@@ -150,6 +190,53 @@ class ConfigTests(unittest.TestCase):
                 }
             )
 
+    def test_validate_collects_errors_without_post_init(self) -> None:
+        POST_INIT_CALLS.clear()
+        errors = SideEffectRootConfig.validate({"child": {"name": "validate"}, "retries": 1})
+        self.assertEqual(errors, [])
+        self.assertEqual(POST_INIT_CALLS, [])
+
+        errors = RootConfig.validate(
+            {
+                "name": 1,
+                "tags": ["a"],
+                "coords": [1, 2, 3],
+                "mode": "debug",
+                "child": {"enabled": "yes", "extra": 1},
+                "unk": "x",
+            }
+        )
+        messages = sorted(str(error) for error in errors)
+        self.assertEqual(len(messages), 6)
+        self.assertIn("<root> contains unknown fields: unk", messages)
+        self.assertIn("child contains unknown fields: extra", messages)
+        self.assertIn("limits must be set.", messages)
+
+        SideEffectRootConfig.from_mapping({"child": {"name": "load"}, "retries": 1})
+        self.assertEqual(POST_INIT_CALLS, ["load"])
+        with self.assertRaises(TypeError):
+            RootConfig.from_mapping({"name": 1})
+
+    def test_check_runs_in_validation_mode_before_post_init(self) -> None:
+        POST_INIT_CALLS.clear()
+        errors = SideEffectRootConfig.validate({"child": {"name": ""}, "retries": "x"})
+        self.assertEqual(
+            sorted(str(error) for error in errors), ["name must not be empty", "retries must be set <class 'int'>."]
+        )
+
+        with self.assertRaisesRegex(ValueError, "name must not be empty"):
+            SideEffectRootConfig.from_mapping({"child": {"name": ""}, "retries": 1})
+        self.assertEqual(POST_INIT_CALLS, [])
+
+    def test_default_factory_configs_follow_the_mode(self) -> None:
+        POST_INIT_CALLS.clear()
+        self.assertEqual(DefaultedSideEffectRootConfig.validate({}), [])
+        self.assertEqual(POST_INIT_CALLS, [])
+
+        config = DefaultedSideEffectRootConfig.from_mapping({})
+        self.assertEqual(config.child, DefaultedSideEffectConfig(name="default"))
+        self.assertEqual(POST_INIT_CALLS, ["default", "default"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+from collections.abc import Callable
+from collections.abc import Collection
+from pathlib import Path
+from types import FrameType
+from typing import Any
+from typing import Final
+from typing import NoReturn
+from typing import cast
+
+logger = logging.getLogger(__name__)
+
+DAEMON_SOCKET_ENV_VAR: Final = "DAEMON_SOCKET_PATH"
+DAEMON_COMMAND_NAME: Final = "daemon"
+
+_LENGTH: Final = struct.Struct("!I")
+_STATUS: Final = struct.Struct("!i")
+_STDIO_FDS: Final = (0, 1, 2)
+_FORWARD_SIGNALS: Final = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT)
+_ACCEPT_TIMEOUT: Final = 1.0
+
+RunFunc = Callable[[list[str]], int]
+PrepareFunc = Callable[[], None]
+
+
+def _recv_exact(conn: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed before message was complete.")
+        data += chunk
+    return bytes(data)
+
+
+def subcommand(argv: list[str], value_options: Collection[str] = ()) -> str | None:
+    # the first positional argument, skipping root options and the values of those in value_options
+    args = iter(argv)
+    for arg in args:
+        if arg == "--":
+            return next(args, None)
+        if not arg.startswith("-"):
+            return arg
+        if arg in value_options:
+            next(args, None)
+    return None
+
+
+def forward(argv: list[str], value_options: Collection[str] = ()) -> int | None:
+    socket_path = os.getenv(DAEMON_SOCKET_ENV_VAR)
+    if not socket_path or subcommand(argv=argv, value_options=value_options) == DAEMON_COMMAND_NAME:
+        return None
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        conn.close()
+        return None
+
+    with conn:
+        header = json.dumps({"argv": [sys.argv[0], *argv], "env": dict(os.environ), "cwd": os.getcwd()}).encode()
+        message = _LENGTH.pack(len(header)) + header
+        try:
+            sent = socket.send_fds(conn, [message], list(_STDIO_FDS))
+            conn.sendall(message[sent:])
+            (pid,) = _STATUS.unpack(_recv_exact(conn, _STATUS.size))
+        except ConnectionError:
+            # the daemon rejected the request before running anything (e.g. a broken config); run it cold
+            return None
+
+        def relay(signum: int, _: FrameType | None) -> None:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+        for signum in _FORWARD_SIGNALS:
+            signal.signal(signum, relay)
+
+        try:
+            (status,) = _STATUS.unpack(_recv_exact(conn, _STATUS.size))
+        except ConnectionError:
+            return 1
+        return status
+
+
+class Daemon:
+    def __init__(self, socket_path: Path, run: RunFunc, prepare: PrepareFunc | None = None) -> None:
+        self._socket_path = socket_path
+        self._run = run
+        self._prepare = prepare
+
+    def serve_forever(self) -> None:
+        if self._socket_path.exists():
+            self._socket_path.unlink()
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(str(self._socket_path))
+        os.chmod(self._socket_path, 0o600)
+        listener.listen(128)
+        listener.settimeout(_ACCEPT_TIMEOUT)
+        previous_handler = signal.signal(signal.SIGTERM, _raise_exit)
+        logger.info("Daemon %d listening on %s.", os.getpid(), self._socket_path)
+        try:
+            while True:
+                _reap()
+                try:
+                    conn, _ = listener.accept()
+                except TimeoutError:
+                    continue
+                with conn:
+                    self._handle(listener=listener, conn=conn)
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+            listener.close()
+            self._socket_path.unlink(missing_ok=True)
+            logger.info("Daemon %d stopped.", os.getpid())
+
+    def _handle(self, listener: socket.socket, conn: socket.socket) -> None:
+        conn.settimeout(None)
+        fds: list[int] = []
+        try:
+            data, fds, _, _ = socket.recv_fds(conn, 64 * 1024, len(_STDIO_FDS))
+            if len(fds) != len(_STDIO_FDS) or len(data) < _LENGTH.size:
+                raise ConnectionError("Client did not send stdio descriptors.")
+            (length,) = _LENGTH.unpack(data[: _LENGTH.size])
+            header = data[_LENGTH.size :]
+            header += _recv_exact(conn, length - len(header))
+            request = cast(dict[str, Any], json.loads(header))
+
+            if self._prepare is not None:
+                self._prepare()
+        except Exception:
+            logger.exception("Daemon failed to accept request.")
+            for fd in fds:
+                os.close(fd)
+            return
+
+        pid = os.fork()
+        if pid == 0:
+            listener.close()
+            self._run_request(conn=conn, fds=fds, request=request)
+        for fd in fds:
+            os.close(fd)
+
+    def _run_request(self, conn: socket.socket, fds: list[int], request: dict[str, Any]) -> NoReturn:
+        status = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            conn.sendall(_STATUS.pack(os.getpid()))
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+            for target_fd, fd in zip(_STDIO_FDS, fds, strict=True):
+                os.dup2(fd, target_fd)
+                os.close(fd)
+
+            time_zone = os.environ.get("TZ")
+            os.environ.clear()
+            os.environ.update(cast(dict[str, str], request["env"]))
+            if time_zone is not None:
+                os.environ.setdefault("TZ", time_zone)
+            time.tzset()
+            os.chdir(cast(str, request["cwd"]))
+
+            argv = cast(list[str], request["argv"])
+            sys.argv = argv
+            status = self._run(argv[1:])
+        except BaseException:
+            logger.exception("Daemon request failed.")
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        try:
+            conn.sendall(_STATUS.pack(status))
+        except OSError:
+            pass
+        os._exit(status)
+
+
+def _raise_exit(signum: int, _: FrameType | None) -> None:
+    raise SystemExit(0)
+
+
+def _reap() -> None:
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+__all__ = ["DAEMON_COMMAND_NAME", "DAEMON_SOCKET_ENV_VAR", "Daemon", "forward", "subcommand"]
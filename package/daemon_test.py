@@ -0,0 +1,154 @@
+import json
+import os
+import signal
+import tempfile
+import time
+import unittest
+from collections.abc import Callable
+from pathlib import Path
+from unittest import mock
+
+import click
+
+from internal import ConfigProxy
+from main import ROOT_VALUE_OPTIONS
+from package.daemon import DAEMON_SOCKET_ENV_VAR
+from package.daemon import Daemon
+from package.daemon import forward
+from package.daemon import subcommand
+
+RELAYED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT)
+
+CONFIG = """
+[application]
+name = "{name}"
+secret = "x"
+[application.time_zone]
+[application.logger]
+version = 1
+"""
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not met")
+        time.sleep(0.01)
+
+
+class SubcommandTests(unittest.TestCase):
+    def test_skips_root_options(self) -> None:
+        self.assertEqual(subcommand(["-c", "daemon", "echo"], ROOT_VALUE_OPTIONS), "echo")
+        self.assertEqual(subcommand(["--config=x.toml", "daemon", "-s", "x"], ROOT_VALUE_OPTIONS), "daemon")
+        self.assertEqual(subcommand(["--profile", "cpu", "script", "-m", "daemon"], ROOT_VALUE_OPTIONS), "script")
+        self.assertEqual(subcommand(["--help"], ROOT_VALUE_OPTIONS), None)
+
+    def test_main_options_match_root_group(self) -> None:
+        from command.root import command
+
+        value_options = {
+            name for param in command.params if isinstance(param, click.Option) and not param.is_flag for name in param.opts
+        }
+        self.assertEqual(value_options, set(ROOT_VALUE_OPTIONS))
+
+
+class ForwardTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = Path(temp_dir.name)
+        self.socket_path = self.temp_dir / "daemon.sock"
+        handlers = {signum: signal.getsignal(signum) for signum in RELAYED_SIGNALS}
+        self.addCleanup(lambda: [signal.signal(signum, handler) for signum, handler in handlers.items()])
+
+    def start_daemon(self, prepare: Callable[[], None] | None = None) -> None:
+        def run(argv: list[str]) -> int:
+            os.write(1, json.dumps({"argv": argv, "env": os.environ.get("DAEMON_TEST"), "cwd": os.getcwd()}).encode())
+            os.write(2, b"to stderr")
+            return 7
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                Daemon(socket_path=self.socket_path, run=run, prepare=prepare).serve_forever()
+            finally:
+                os._exit(0)
+
+        def stop() -> None:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+
+        self.addCleanup(stop)
+        wait_for(self.socket_path.exists)
+
+    def forward_captured(self, argv: list[str]) -> tuple[int | None, str, str]:
+        out_path, err_path = self.temp_dir / "out", self.temp_dir / "err"
+        saved = [os.dup(1), os.dup(2)]
+        try:
+            with out_path.open("wb") as out, err_path.open("wb") as err:
+                os.dup2(out.fileno(), 1)
+                os.dup2(err.fileno(), 2)
+                status = forward(argv=argv, value_options=ROOT_VALUE_OPTIONS)
+        finally:
+            for fd, saved_fd in zip((1, 2), saved, strict=True):
+                os.dup2(saved_fd, fd)
+                os.close(saved_fd)
+        return status, out_path.read_text(), err_path.read_text()
+
+    def test_round_trip(self) -> None:
+        self.start_daemon()
+        env = {DAEMON_SOCKET_ENV_VAR: str(self.socket_path), "DAEMON_TEST": "forwarded"}
+        with mock.patch.dict(os.environ, env):
+            cwd = os.getcwd()
+            os.chdir(self.temp_dir)
+            try:
+                status, out, err = self.forward_captured(["-c", "x.toml", "echo", "hi"])
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(status, 7)
+        self.assertEqual(err, "to stderr")
+        request = json.loads(out)
+        self.assertEqual(request["argv"], ["-c", "x.toml", "echo", "hi"])
+        self.assertEqual(request["env"], "forwarded")
+        self.assertEqual(Path(request["cwd"]).resolve(), self.temp_dir.resolve())
+
+    def test_falls_back_without_daemon(self) -> None:
+        with mock.patch.dict(os.environ, {DAEMON_SOCKET_ENV_VAR: str(self.socket_path)}):
+            self.assertIsNone(forward(argv=["echo"]))
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(forward(argv=["echo"]))
+
+    def test_falls_back_when_daemon_rejects_request(self) -> None:
+        def prepare() -> None:
+            raise ValueError("broken config")
+
+        self.start_daemon(prepare=prepare)
+        with mock.patch.dict(os.environ, {DAEMON_SOCKET_ENV_VAR: str(self.socket_path)}):
+            self.assertIsNone(self.forward_captured(["echo"])[0])
+
+    def test_daemon_command_is_not_forwarded(self) -> None:
+        self.start_daemon()
+        with mock.patch.dict(os.environ, {DAEMON_SOCKET_ENV_VAR: str(self.socket_path)}):
+            self.assertIsNone(forward(argv=["-c", "x.toml", "daemon"], value_options=ROOT_VALUE_OPTIONS))
+
+
+class ConfigProxyTests(unittest.TestCase):
+    def test_reuses_config_until_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file_path = Path(temp_dir) / "config.toml"
+            config_file_path.write_text(CONFIG.format(name="first"))
+            proxy = ConfigProxy()
+
+            first = proxy.load(config_file_path=config_file_path)
+            self.assertIs(proxy.load(config_file_path=config_file_path), first)
+
+            config_file_path.write_text(CONFIG.format(name="second!"))
+            second = proxy.load(config_file_path=config_file_path)
+            self.assertIsNot(second, first)
+            self.assertEqual(proxy.application.name, "second!")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,473 @@
+import abc
+import bisect
+import contextlib
+import math
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+from typing import Final
+from typing import Generic
+from typing import Protocol
+from typing import TypeVar
+from typing import cast
+
+CONTENT_TYPE: Final = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS: Final = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Owner:
+    # lives only in one thread's threading.local, so it is collected when that thread exits
+    __slots__ = ("__weakref__",)
+
+
+class _Shards:
+    # Each thread owns one cell and is its only writer, so increments need no lock; readers merge all cells.
+    # When a thread exits its cell is folded into _retired, so short-lived threads do not grow _cells forever.
+    __slots__ = ("_cells", "_local", "_lock", "_retired", "_width")
+
+    def __init__(self, width: int) -> None:
+        self._width = width
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cells: dict[int, list[float]] = {}
+        self._retired = [0.0] * width
+
+    def cell(self) -> list[float]:
+        cell: list[float] | None = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = [0.0] * self._width
+            owner = _Owner()
+            with self._lock:
+                self._cells[id(cell)] = cell
+            weakref.finalize(owner, self._retire, cell)
+            self._local.owner = owner
+            self._local.cell = cell
+        return cell
+
+    def _retire(self, cell: list[float]) -> None:
+        with self._lock:
+            del self._cells[id(cell)]
+            for idx, value in enumerate(cell):
+                self._retired[idx] += value
+
+    def merged(self) -> list[float]:
+        # summed under the lock so a cell being retired is never counted twice
+        with self._lock:
+            totals = list(self._retired)
+            for cell in self._cells.values():
+                for idx, value in enumerate(cell):
+                    totals[idx] += value
+        return totals
+
+
+class CounterChild:
+    __slots__ = ("_shards",)
+
+    def __init__(self) -> None:
+        self._shards = _Shards(width=1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counter can only increase.")
+        self._shards.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._shards.merged()[0]
+
+
+class GaugeChild:
+    __slots__ = ("_lock", "_value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class HistogramChild:
+    __slots__ = ("_buckets", "_shards")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self._buckets = buckets
+        # one slot per bucket, one for +Inf, one for the sum
+        self._shards = _Shards(width=len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        cell = self._shards.cell()
+        cell[bisect.bisect_left(self._buckets, value)] += 1
+        cell[-1] += value
+
+    @contextlib.contextmanager
+    def time(self) -> Generator[None, None, None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at)
+
+    def snapshot(self) -> tuple[list[float], float, float]:
+        merged = self._shards.merged()
+        cumulative: list[float] = []
+        total = 0.0
+        for count in merged[:-1]:
+            total += count
+            cumulative.append(total)
+        return cumulative, total, merged[-1]
+
+
+ChildType = TypeVar("ChildType", CounterChild, GaugeChild, HistogramChild)
+
+
+class Metric(abc.ABC, Generic[ChildType]):
+    type_name: str = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], ChildType] = {}
+        self._default = self.labels() if not self.label_names else None
+
+    @abc.abstractmethod
+    def _new_child(self) -> ChildType: ...
+
+    def labels(self, *values: str, **labels: str) -> ChildType:
+        if labels:
+            if values:
+                raise ValueError("Pass label values either positionally or by name, not both.")
+            try:
+                values = tuple(labels[name] for name in self.label_names)
+            except KeyError as exc:
+                raise ValueError(f"Missing label {exc} for metric '{self.name}'.") from exc
+            if len(labels) != len(self.label_names):
+                raise ValueError(f"Unknown labels for metric '{self.name}': {sorted(set(labels) - set(self.label_names))}")
+        if len(values) != len(self.label_names):
+            raise ValueError(f"Metric '{self.name}' expects labels {self.label_names}, got {values}.")
+
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _require_default(self) -> ChildType:
+        if self._default is None:
+            raise ValueError(f"Metric '{self.name}' has labels {self.label_names}; call labels(...) first.")
+        return self._default
+
+    def children(self) -> list[tuple[tuple[str, ...], ChildType]]:
+        with self._lock:
+            return list(self._children.items())
+
+    @abc.abstractmethod
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]: ...
+
+
+class Counter(Metric[CounterChild]):
+    type_name = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._require_default().inc(amount)
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for values, child in self.children():
+            yield self.name, dict(zip(self.label_names, values)), child.value
+
+
+class Gauge(Metric[GaugeChild]):
+    type_name = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._require_default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._require_default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._require_default().dec(amount)
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for values, child in self.children():
+            yield self.name, dict(zip(self.label_names, values)), child.value
+
+
+class Histogram(Metric[HistogramChild]):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets if bucket != math.inf))
+        if not self.buckets:
+            raise ValueError(f"Histogram '{name}' needs at least one finite bucket.")
+        super().__init__(name=name, documentation=documentation, label_names=label_names)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._require_default().observe(value)
+
+    def time(self) -> contextlib.AbstractContextManager[None]:
+        return self._require_default().time()
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        bounds = [_format_value(bucket) for bucket in self.buckets] + ["+Inf"]
+        for values, child in self.children():
+            labels = dict(zip(self.label_names, values))
+            cumulative, count, total = child.snapshot()
+            for bound, bucket_count in zip(bounds, cumulative, strict=True):
+                yield f"{self.name}_bucket", {**labels, "le": bound}, bucket_count
+            yield f"{self.name}_count", labels, count
+            yield f"{self.name}_sum", labels, total
+
+
+MetricType = TypeVar("MetricType", Counter, Gauge, Histogram)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def register(self, metric: MetricType) -> MetricType:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                    raise ValueError(f"Metric '{metric.name}' is already registered with a different type or labels.")
+                return cast(MetricType, existing)
+            self._metrics[metric.name] = metric
+            return metric
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def exposition(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    label_str = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+                    lines.append(f"{name}{{{label_str}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+registry = Registry()
+
+
+class Exposable(Protocol):
+    def exposition(self) -> str: ...
+
+
+def merge_expositions(texts: Iterable[str]) -> str:
+    # Sums samples with the same name and labels across texts; a family keeps the HELP and TYPE lines seen first.
+    families: dict[str, tuple[dict[str, str], dict[str, float]]] = {}
+    for text in texts:
+        samples: dict[str, float] = {}
+        for line in text.splitlines():
+            if line.startswith("# "):
+                _, kind, name = line.split(" ", 3)[:3]
+                headers, samples = families.setdefault(name, ({}, {}))
+                headers.setdefault(kind, line)
+            elif line:
+                key, _, value = line.rpartition(" ")
+                samples[key] = samples.get(key, 0.0) + float(value)
+
+    lines: list[str] = []
+    for name in sorted(families):
+        headers, samples = families[name]
+        lines.extend(headers.values())
+        lines.extend(f"{key} {_format_value(value)}" for key, value in samples.items())
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class ProcessGroup:
+    # Forked workers sharing a directory: each publishes its registry there as <pid>.prom (see FileExporter) and
+    # exposes the sum over all files. Files of exited workers are kept so counters never go backwards.
+    def __init__(self, directory: Path, metrics_registry: Registry = registry) -> None:
+        self.directory = directory
+        self.path = directory / f"{os.getpid()}.prom"
+        self._registry = metrics_registry
+
+    def exposition(self) -> str:
+        texts = [self._registry.exposition()]
+        for path in self.directory.glob("*.prom"):
+            if path == self.path:
+                continue
+            try:
+                texts.append(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                continue
+        return merge_expositions(texts)
+
+
+def counter(name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+    return registry.register(Counter(name=name, documentation=documentation, label_names=label_names))
+
+
+def gauge(name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+    return registry.register(Gauge(name=name, documentation=documentation, label_names=label_names))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    label_names: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return registry.register(Histogram(name=name, documentation=documentation, label_names=label_names, buckets=buckets))
+
+
+def write_file(path: Path, metrics_registry: Exposable = registry) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(metrics_registry.exposition())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class FileExporter:
+    def __init__(self, path: Path, interval: float, metrics_registry: Exposable = registry) -> None:
+        self._path = path
+        self._interval = interval
+        self._registry = metrics_registry
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-file", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            write_file(path=self._path, metrics_registry=self._registry)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        write_file(path=self._path, metrics_registry=self._registry)
+
+
+class HTTPExporter:
+    def __init__(self, host: str, port: int, metrics_registry: Exposable = registry, reuse_port: bool = False) -> None:
+        exposition = metrics_registry.exposition
+
+        # http.server is imported here so the CLI does not pay for it unless an endpoint is configured
+        from http.server import BaseHTTPRequestHandler
+        from http.server import ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exposition().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        class Server(ThreadingHTTPServer):
+            # forked workers serving the same merged view can share the port
+            allow_reuse_port = reuse_port
+
+        self._server = Server((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Exposable",
+    "FileExporter",
+    "Gauge",
+    "HTTPExporter",
+    "Histogram",
+    "ProcessGroup",
+    "Registry",
+    "counter",
+    "gauge",
+    "histogram",
+    "merge_expositions",
+    "registry",
+    "write_file",
+]
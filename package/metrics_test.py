@@ -0,0 +1,193 @@
+import os
+import signal
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+from pathlib import Path
+
+import package
+from package.metrics import Counter
+from package.metrics import Gauge
+from package.metrics import Histogram
+from package.metrics import HTTPExporter
+from package.metrics import Metric
+from package.metrics import Registry
+from package.metrics import merge_expositions
+from package.metrics import write_file
+from package.prefork import Supervisor
+from package.prefork import create_listener
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = Registry()
+
+    def test_counter_merges_thread_shards(self) -> None:
+        requests = self.registry.register(Counter("requests_total", "Requests.", ("method",)))
+        get = requests.labels("GET")
+        self.assertIs(get, requests.labels(method="GET"))
+
+        def work() -> None:
+            for _ in range(10_000):
+                get.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(get.value, 40_000)
+
+        with self.assertRaises(ValueError):
+            requests.inc()
+        with self.assertRaises(ValueError):
+            requests.labels(path="/")
+
+    def test_exited_threads_are_folded(self) -> None:
+        jobs = self.registry.register(Histogram("job_seconds", "Jobs.", buckets=(1.0,))).labels()
+        for _ in range(50):
+            thread = threading.Thread(target=jobs.observe, args=(0.5,))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(len(jobs._shards._cells), 0)  # pyright: ignore[reportPrivateUsage]
+        self.assertEqual(jobs.snapshot(), ([50.0, 50.0], 50.0, 25.0))
+
+    def test_exposition(self) -> None:
+        self.registry.register(Counter("jobs_total", "Jobs.")).inc(3)
+        gauge = self.registry.register(Gauge("queue_depth", "Queue depth.", ("queue",)))
+        gauge.labels('a"b').set(2.5)
+        histogram = self.registry.register(Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        self.assertEqual(
+            self.registry.exposition(),
+            "# HELP jobs_total Jobs.\n"
+            "# TYPE jobs_total counter\n"
+            "jobs_total 3\n"
+            "# HELP latency_seconds Latency.\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{le="0.1"} 2\n'
+            'latency_seconds_bucket{le="1"} 3\n'
+            'latency_seconds_bucket{le="+Inf"} 4\n'
+            "latency_seconds_count 4\n"
+            "latency_seconds_sum 5.65\n"
+            "# HELP queue_depth Queue depth.\n"
+            "# TYPE queue_depth gauge\n"
+            'queue_depth{queue="a\\"b"} 2.5\n',
+        )
+
+    def test_register_is_idempotent(self) -> None:
+        first = self.registry.register(Counter("hits_total", "Hits."))
+        self.assertIs(self.registry.register(Counter("hits_total", "Hits.")), first)
+        with self.assertRaises(ValueError):
+            self.registry.register(Gauge("hits_total", "Hits."))
+
+    def test_metric_is_abstract(self) -> None:
+        with self.assertRaises(TypeError):
+            Metric("base", "Base.")  # pyright: ignore[reportAbstractUsage]
+
+    def test_config_exporters_write_on_exit(self) -> None:
+        from internal.config.metrics import Metrics
+
+        package.metrics.registry.register(Counter("config_exported_total", "Exported.")).inc()
+        self.addCleanup(package.metrics.registry.unregister, "config_exported_total")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "metrics.prom"
+            with Metrics.from_mapping({"file": str(path), "interval": 60}).exporters():
+                self.assertFalse(path.exists())
+            self.assertIn("config_exported_total 1\n", path.read_text())
+
+    def test_exporters(self) -> None:
+        self.registry.register(Counter("exported_total", "Exported.")).inc()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "metrics.prom"
+            write_file(path=path, metrics_registry=self.registry)
+            self.assertIn("exported_total 1\n", path.read_text())
+
+        exporter = HTTPExporter(host="127.0.0.1", port=0, metrics_registry=self.registry)
+        exporter.start()
+        try:
+            host, port = exporter.address
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                self.assertIn(b"exported_total 1\n", response.read())
+        finally:
+            exporter.stop()
+
+    def test_merge_expositions(self) -> None:
+        histogram = self.registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(1.0,)))
+        histogram.labels("a").observe(0.5)
+        other = Registry()
+        other.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(1.0,))).labels("b").observe(2.0)
+        other.register(Counter("jobs_total", "Jobs.")).inc(2)
+        self.registry.register(Counter("jobs_total", "Jobs.")).inc()
+
+        self.assertEqual(
+            merge_expositions([self.registry.exposition(), other.exposition()]),
+            "# HELP jobs_total Jobs.\n"
+            "# TYPE jobs_total counter\n"
+            "jobs_total 3\n"
+            "# HELP latency_seconds Latency.\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{route="a",le="1"} 1\n'
+            'latency_seconds_bucket{route="a",le="+Inf"} 1\n'
+            'latency_seconds_count{route="a"} 1\n'
+            'latency_seconds_sum{route="a"} 0.5\n'
+            'latency_seconds_bucket{route="b",le="1"} 0\n'
+            'latency_seconds_bucket{route="b",le="+Inf"} 1\n'
+            'latency_seconds_count{route="b"} 1\n'
+            'latency_seconds_sum{route="b"} 2\n',
+        )
+
+    def test_forked_workers_export_merged_counters(self) -> None:
+        from internal.config.metrics import Metrics
+
+        served = package.metrics.counter("worker_served_total", "Served by forked workers.")
+        self.addCleanup(package.metrics.registry.unregister, "worker_served_total")
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        metrics = Metrics.from_mapping({"port": port, "interval": 0.05})
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        sock = create_listener(host="127.0.0.1", port=0)
+        self.addCleanup(sock.close)
+
+        def target(_: socket.socket) -> None:
+            with metrics.exporters(shared_dir=Path(temp_dir.name)):
+                served.inc()
+                while True:
+                    time.sleep(60)
+
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                Supervisor(target=target, sock=sock, workers=2, graceful_timeout=5.0).run()
+            except BaseException:
+                code = 1
+            os._exit(code)
+        try:
+            body = ""
+            deadline = time.monotonic() + 10
+            while "worker_served_total 2\n" not in body and time.monotonic() < deadline:
+                time.sleep(0.05)
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                        body = response.read().decode()
+                except OSError:
+                    continue
+            self.assertIn("worker_served_total 2\n", body)
+        finally:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        # the parent never counted anything itself
+        self.assertEqual(served.labels().value, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
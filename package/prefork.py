@@ -0,0 +1,295 @@
+import dataclasses
+import enum
+import gc
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from collections.abc import Callable
+from types import FrameType
+from typing import Any
+from typing import Final
+from typing import NoReturn
+
+logger = logging.getLogger(__name__)
+
+WorkerTarget = Callable[[socket.socket], Any]
+
+_PAGE_SIZE: Final = os.sysconf("SC_PAGE_SIZE")
+_TICK_SECONDS: Final = 1.0
+_STOP_SIGNALS: Final = (signal.SIGTERM, signal.SIGINT)
+_HANDLED_SIGNALS: Final = (*_STOP_SIGNALS, signal.SIGHUP, signal.SIGCHLD)
+
+
+def create_listener(host: str, port: int, backlog: int = 1024) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    sock.set_inheritable(True)
+    return sock
+
+
+def resident_memory(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as file:
+            return int(file.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+class WorkerState(enum.Enum):
+    RUNNING = "running"
+    RECYCLING = "recycling"
+    RETIRING = "retiring"
+
+
+@dataclasses.dataclass
+class _Worker:
+    slot: int
+    pid: int
+    started_at: float
+    state: WorkerState = WorkerState.RUNNING
+    deadline: float | None = None
+
+
+def _exit_code(exc: SystemExit) -> int:
+    # same mapping as the interpreter: None is success, any other non-int is printed and exits 1
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+class Supervisor:
+    def __init__(
+        self,
+        target: WorkerTarget,
+        sock: socket.socket,
+        *,
+        workers: int,
+        memory_limit: int = 0,
+        backoff: float = 1.0,
+        backoff_max: float = 30.0,
+        graceful_timeout: float = 30.0,
+    ) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}.")
+        self._target = target
+        self._sock = sock
+        self._worker_count = workers
+        self._memory_limit = memory_limit
+        self._backoff = backoff
+        self._backoff_max = backoff_max
+        self._graceful_timeout = graceful_timeout
+
+        self._workers: dict[int, _Worker] = {}
+        self._failures: dict[int, int] = {}
+        self._pending: dict[int, float] = {}
+        self._rolling: list[int] = []
+        self._stopping = False
+        self._reload = False
+
+    @property
+    def pids(self) -> list[int]:
+        return sorted(self._workers)
+
+    def run(self) -> None:
+        wakeup_r, wakeup_w = os.pipe()
+        os.set_blocking(wakeup_r, False)
+        os.set_blocking(wakeup_w, False)
+        previous_handlers = {signum: signal.signal(signum, self._handle_signal) for signum in _HANDLED_SIGNALS}
+        previous_wakeup_fd = signal.set_wakeup_fd(wakeup_w)
+
+        gc.collect()
+        gc.freeze()
+        logger.info("Supervisor %d starting %d workers.", os.getpid(), self._worker_count)
+        try:
+            for slot in range(self._worker_count):
+                self._spawn(slot=slot)
+
+            while not self._stopping:
+                self._wait(wakeup_r=wakeup_r)
+                self._reap()
+                if self._reload:
+                    self._reload = False
+                    self._start_rolling_restart()
+                self._advance_rolling_restart()
+                self._check_memory()
+                self._kill_overdue()
+                self._spawn_pending()
+        finally:
+            self._shutdown()
+            signal.set_wakeup_fd(previous_wakeup_fd)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            os.close(wakeup_r)
+            os.close(wakeup_w)
+            logger.info("Supervisor %d stopped.", os.getpid())
+
+    def _handle_signal(self, signum: int, _: FrameType | None) -> None:
+        if signum in _STOP_SIGNALS:
+            self._stopping = True
+        elif signum == signal.SIGHUP:
+            self._reload = True
+
+    def _wait(self, wakeup_r: int) -> None:
+        timeout = _TICK_SECONDS
+        if self._pending:
+            timeout = max(0.0, min(timeout, min(self._pending.values()) - time.monotonic()))
+        try:
+            select.select([wakeup_r], [], [], timeout)
+        except InterruptedError:
+            pass
+        try:
+            while os.read(wakeup_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _spawn(self, slot: int) -> None:
+        self._pending.pop(slot, None)
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self._workers[pid] = _Worker(slot=slot, pid=pid, started_at=time.monotonic())
+        logger.info("Worker %d started in slot %d.", pid, slot)
+
+    def _run_worker(self) -> NoReturn:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGTERM, _raise_exit)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+        code = 0
+        try:
+            self._target(self._sock)
+        except SystemExit as exc:
+            code = _exit_code(exc)
+        except BaseException:
+            logger.exception("Worker %d crashed.", os.getpid())
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        os._exit(code)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            worker = self._workers.pop(pid, None)
+            if worker is None:
+                continue
+
+            exit_code = os.waitstatus_to_exitcode(status)
+            if self._stopping or worker.state == WorkerState.RETIRING:
+                logger.info("Worker %d exited with %d.", pid, exit_code)
+                continue
+            if worker.state == WorkerState.RECYCLING:
+                logger.info("Worker %d recycled with %d.", pid, exit_code)
+                self._spawn(slot=worker.slot)
+                continue
+
+            now = time.monotonic()
+            if now - worker.started_at >= self._backoff_max:
+                self._failures[worker.slot] = 0
+            failures = self._failures.get(worker.slot, 0) + 1
+            self._failures[worker.slot] = failures
+            delay = min(self._backoff * 2 ** (failures - 1), self._backoff_max)
+            self._pending[worker.slot] = now + delay
+            logger.warning("Worker %d exited with %d, restarting slot %d in %.1fs.", pid, exit_code, worker.slot, delay)
+
+    def _start_rolling_restart(self) -> None:
+        self._rolling = [pid for pid, worker in self._workers.items() if worker.state == WorkerState.RUNNING]
+        logger.info("Rolling restart of %d workers.", len(self._rolling))
+
+    def _advance_rolling_restart(self) -> None:
+        if any(worker.state == WorkerState.RETIRING for worker in self._workers.values()):
+            return
+        while self._rolling:
+            worker = self._workers.get(self._rolling.pop(0))
+            if worker is None or worker.state != WorkerState.RUNNING:
+                continue
+            self._spawn(slot=worker.slot)
+            self._terminate(worker=worker, state=WorkerState.RETIRING)
+            return
+
+    def _check_memory(self) -> None:
+        if self._memory_limit <= 0:
+            return
+        for worker in list(self._workers.values()):
+            if worker.state != WorkerState.RUNNING:
+                continue
+            rss = resident_memory(pid=worker.pid)
+            if rss > self._memory_limit:
+                logger.warning("Worker %d uses %d bytes, over limit %d.", worker.pid, rss, self._memory_limit)
+                self._terminate(worker=worker, state=WorkerState.RECYCLING)
+
+    def _terminate(self, worker: _Worker, state: WorkerState) -> None:
+        worker.state = state
+        worker.deadline = time.monotonic() + self._graceful_timeout
+        _kill(pid=worker.pid, signum=signal.SIGTERM)
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for worker in self._workers.values():
+            if worker.deadline is not None and worker.deadline <= now:
+                logger.warning("Worker %d did not exit in %.1fs, killing.", worker.pid, self._graceful_timeout)
+                worker.deadline = None
+                _kill(pid=worker.pid, signum=signal.SIGKILL)
+
+    def _spawn_pending(self) -> None:
+        now = time.monotonic()
+        for slot, due in list(self._pending.items()):
+            if due <= now:
+                self._spawn(slot=slot)
+
+    def _shutdown(self) -> None:
+        self._pending.clear()
+        self._rolling.clear()
+        for worker in self._workers.values():
+            self._terminate(worker=worker, state=WorkerState.RETIRING)
+
+        deadline = time.monotonic() + self._graceful_timeout
+        while self._workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for worker in self._workers.values():
+            _kill(pid=worker.pid, signum=signal.SIGKILL)
+        while self._workers:
+            try:
+                pid, _ = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            self._workers.pop(pid, None)
+
+
+def _raise_exit(signum: int, _: FrameType | None) -> None:
+    raise SystemExit(0)
+
+
+def _kill(pid: int, signum: int) -> None:
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+__all__ = ["Supervisor", "WorkerState", "WorkerTarget", "create_listener", "resident_memory"]
@@ -0,0 +1,133 @@
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+
+from package.prefork import Supervisor
+from package.prefork import create_listener
+from package.prefork import resident_memory
+
+WORKERS = 4
+PAYLOAD_SIZE = 300_000
+PAYLOAD_CODE = f"payload = [str(i) * 8 for i in range({PAYLOAD_SIZE})]"
+
+
+def proportional_memory(pid: int) -> int:
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        if line.startswith("Pss:"):
+            return int(line.split()[1]) * 1024
+    return 0
+
+
+def read_pids(fd: int, count: int, timeout: float = 10.0) -> list[int]:
+    data = b""
+    deadline = time.monotonic() + timeout
+    while data.count(b"\n") < count:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            raise TimeoutError(f"{count} workers did not report in {timeout}s")
+        data += os.read(fd, 4096)
+    return [int(line) for line in data.splitlines()]
+
+
+def wait_exit(pid: int) -> None:
+    os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+
+
+@unittest.skipUnless(Path("/proc/self/smaps_rollup").exists(), "requires Linux /proc")
+class SupervisorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sock = create_listener(host="127.0.0.1", port=0)
+        self.ready_r, self.ready_w = os.pipe()
+
+    def tearDown(self) -> None:
+        self.sock.close()
+        os.close(self.ready_r)
+        os.close(self.ready_w)
+
+    def start_supervisor(self, workers: int, **kwargs: Any) -> int:
+        ready_w = self.ready_w
+
+        def target(_: socket.socket) -> None:
+            os.write(ready_w, f"{os.getpid()}\n".encode())
+            while True:
+                time.sleep(60)
+
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                Supervisor(target=target, sock=self.sock, workers=workers, graceful_timeout=5.0, **kwargs).run()
+            except BaseException:
+                code = 1
+            os._exit(code)
+        return pid
+
+    def test_restart_crashed_worker(self) -> None:
+        supervisor_pid = self.start_supervisor(workers=2, backoff=0.01)
+        try:
+            first = read_pids(self.ready_r, 2)
+            os.kill(first[0], signal.SIGKILL)
+            (replacement,) = read_pids(self.ready_r, 1)
+            self.assertNotIn(replacement, first)
+        finally:
+            wait_exit(supervisor_pid)
+
+    def test_worker_exit_codes(self) -> None:
+        for code, expected in ((None, 0), (3, 3), ("bad config", 1)):
+            supervisor = Supervisor(target=lambda _, code=code: sys.exit(code), sock=self.sock, workers=1)
+            pid = os.fork()
+            if pid == 0:
+                os.dup2(os.open(os.devnull, os.O_WRONLY), 2)
+                supervisor._run_worker()  # pyright: ignore[reportPrivateUsage]
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(os.waitstatus_to_exitcode(status), expected, code)
+
+    def test_rolling_restart_on_sighup(self) -> None:
+        supervisor_pid = self.start_supervisor(workers=2)
+        try:
+            first = read_pids(self.ready_r, 2)
+            os.kill(supervisor_pid, signal.SIGHUP)
+            second = read_pids(self.ready_r, 2)
+            self.assertFalse(set(first) & set(second))
+        finally:
+            wait_exit(supervisor_pid)
+
+    def test_forked_workers_share_memory(self) -> None:
+        payload = [str(i) * 8 for i in range(PAYLOAD_SIZE)]
+        supervisor_pid = self.start_supervisor(workers=WORKERS)
+        independent: list[subprocess.Popen[bytes]] = []
+        try:
+            forked_pids = read_pids(self.ready_r, WORKERS)
+            code = f"import os, time\n{PAYLOAD_CODE}\nos.write({self.ready_w}, f'{{os.getpid()}}\\n'.encode())\ntime.sleep(60)"
+            for _ in range(WORKERS):
+                independent.append(subprocess.Popen([sys.executable, "-c", code], pass_fds=(self.ready_w,)))
+            independent_pids = read_pids(self.ready_r, WORKERS)
+
+            forked_rss = sum(resident_memory(pid) for pid in forked_pids)
+            independent_rss = sum(resident_memory(pid) for pid in independent_pids)
+            forked_pss = sum(proportional_memory(pid) for pid in forked_pids)
+            independent_pss = sum(proportional_memory(pid) for pid in independent_pids)
+            self.assertLess(
+                forked_pss,
+                independent_pss,
+                f"{WORKERS} workers: forked rss={forked_rss >> 20}MiB pss={forked_pss >> 20}MiB, "
+                f"independent rss={independent_rss >> 20}MiB pss={independent_pss >> 20}MiB",
+            )
+        finally:
+            for process in independent:
+                process.kill()
+                process.wait()
+            wait_exit(supervisor_pid)
+        del payload
+
+
+if __name__ == "__main__":
+    unittest.main()
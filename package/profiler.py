@@ -0,0 +1,166 @@
+import abc
+import cProfile
+import enum
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Final
+
+DEFAULT_SAMPLE_INTERVAL: Final = 0.005
+ALLOC_TRACEBACK_LIMIT: Final = 32
+
+
+class ProfileMode(enum.Enum):
+    CPU = "cpu"
+    WALL = "wall"
+    ALLOC = "alloc"
+
+
+def _frame_label(filename: str, lineno: int, name: str | None = None) -> str:
+    location = f"{filename}:{lineno}"
+    label = f"{name} ({location})" if name else location
+    return label.replace(";", ":")
+
+
+def _write_collapsed(path: Path, stacks: Counter[tuple[str, ...]]) -> None:
+    with path.open("w", encoding="utf-8") as file:
+        for stack, weight in sorted(stacks.items()):
+            file.write(f"{';'.join(stack)} {weight}\n")
+
+
+class Profiler(abc.ABC):
+    suffix: str = ""
+
+    def __init__(self, output_path: Path, top: int) -> None:
+        self.output_path = output_path.with_suffix(self.suffix)
+        self.top = top
+
+    @abc.abstractmethod
+    def start(self) -> None: ...
+
+    @abc.abstractmethod
+    def stop(self) -> str: ...
+
+
+class CpuProfiler(Profiler):
+    suffix = ".pstats"
+
+    def __init__(self, output_path: Path, top: int) -> None:
+        super().__init__(output_path=output_path, top=top)
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profile.enable()
+
+    def stop(self) -> str:
+        self._profile.disable()
+        self._profile.dump_stats(self.output_path)
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        return stream.getvalue()
+
+
+class WallProfiler(Profiler):
+    suffix = ".collapsed"
+
+    def __init__(self, output_path: Path, top: int, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        super().__init__(output_path=output_path, top=top)
+        self._interval = interval
+        self._stacks: Counter[tuple[str, ...]] = Counter()
+        self._samples = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _run(self) -> None:
+        sampler_id = threading.get_ident()
+        while not self._stopped.wait(self._interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():  # pyright: ignore[reportPrivateUsage]
+                if thread_id == sampler_id:
+                    continue
+                self._stacks[self._collapse(thread_names.get(thread_id, str(thread_id)), frame)] += 1
+            self._samples += 1
+
+    @staticmethod
+    def _collapse(thread_name: str, frame: FrameType | None) -> tuple[str, ...]:
+        stack: list[str] = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        stack.append(thread_name)
+        stack.reverse()
+        return tuple(stack)
+
+    def stop(self) -> str:
+        self._stopped.set()
+        self._thread.join()
+        _write_collapsed(self.output_path, self._stacks)
+
+        leaf_counts: Counter[str] = Counter()
+        for stack, count in self._stacks.items():
+            leaf_counts[stack[-1]] += count
+        lines = [f"{self._samples} samples every {self._interval * 1000:.1f}ms, top {self.top} leaf frames:"]
+        for label, count in leaf_counts.most_common(self.top):
+            lines.append(f"{count / max(self._samples, 1) * 100:6.2f}%  {label}")
+        return "\n".join(lines) + "\n"
+
+
+class AllocProfiler(Profiler):
+    suffix = ".collapsed"
+
+    def start(self) -> None:
+        tracemalloc.start(ALLOC_TRACEBACK_LIMIT)
+
+    def stop(self) -> str:
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>"))
+        )
+
+        stacks: Counter[tuple[str, ...]] = Counter()
+        for trace in snapshot.traces:
+            stack = tuple(_frame_label(frame.filename, frame.lineno) for frame in reversed(trace.traceback))
+            stacks[stack] += trace.size
+        _write_collapsed(self.output_path, stacks)
+
+        statistics = snapshot.statistics("lineno")
+        total = sum(stat.size for stat in statistics)
+        lines = [f"{total / 1024:.1f} KiB live, {peak / 1024:.1f} KiB peak, top {self.top} allocation sites:"]
+        for stat in statistics[: self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+
+_PROFILERS: Final[dict[ProfileMode, type[Profiler]]] = {
+    ProfileMode.CPU: CpuProfiler,
+    ProfileMode.WALL: WallProfiler,
+    ProfileMode.ALLOC: AllocProfiler,
+}
+
+
+def start(mode: ProfileMode, output_dir: Path, name: str, top: int = 20) -> Profiler:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    output_path = output_dir / f"{name}-{mode.value}-{timestamp}-{os.getpid()}"
+    profiler = _PROFILERS[mode](output_path=output_path, top=top)
+    profiler.start()
+    return profiler
+
+
+__all__ = ["AllocProfiler", "CpuProfiler", "ProfileMode", "Profiler", "WallProfiler", "start"]
@@ -0,0 +1,130 @@
+import pstats
+import sys
+import tempfile
+import textwrap
+import time
+import types
+import unittest
+from pathlib import Path
+from typing import Any
+from typing import cast
+
+from click.testing import CliRunner
+
+from package.profiler import AllocProfiler
+from package.profiler import CpuProfiler
+from package.profiler import ProfileMode
+from package.profiler import Profiler
+from package.profiler import WallProfiler
+from package.profiler import start
+
+CONFIG = """
+[application]
+name = "profile-test"
+secret = "x"
+[application.time_zone]
+[application.logger]
+version = 1
+"""
+
+PROBE_MODULE = "script.profile_probe"
+PROBE_CODE = """
+import asyncio
+
+
+async def main() -> None:
+    await asyncio.sleep(0.01)
+    sum(range(100_000))
+"""
+
+
+def busy_work() -> list[bytes]:
+    deadline = time.perf_counter() + 0.05
+    chunks: list[bytes] = []
+    while time.perf_counter() < deadline:
+        chunks.append(bytes(1024))
+    return chunks
+
+
+def pstats_functions(path: Path) -> set[tuple[str, int, str]]:
+    return set(cast(dict[tuple[str, int, str], Any], getattr(pstats.Stats(str(path)), "stats")))
+
+
+def read_collapsed(path: Path) -> dict[str, int]:
+    stacks: dict[str, int] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        stack, _, weight = line.rpartition(" ")
+        stacks[stack] = int(weight)
+    return stacks
+
+
+class ProfilerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.output_dir = Path(temp_dir.name)
+
+    def test_abstract(self) -> None:
+        with self.assertRaises(TypeError):
+            Profiler(output_path=self.output_dir / "x", top=1)  # pyright: ignore[reportAbstractUsage]
+
+    def test_cpu(self) -> None:
+        profiler = start(mode=ProfileMode.CPU, output_dir=self.output_dir, name="test", top=5)
+        self.assertIsInstance(profiler, CpuProfiler)
+        busy_work()
+        summary = profiler.stop()
+
+        self.assertEqual(profiler.output_path.suffix, ".pstats")
+        self.assertIn("busy_work", summary)
+        functions = {name for _, _, name in pstats_functions(profiler.output_path)}
+        self.assertIn("busy_work", functions)
+
+    def test_wall(self) -> None:
+        profiler = WallProfiler(output_path=self.output_dir / "wall", top=5, interval=0.001)
+        profiler.start()
+        busy_work()
+        summary = profiler.stop()
+
+        self.assertEqual(profiler.output_path.suffix, ".collapsed")
+        self.assertIn("samples every", summary)
+        stacks = read_collapsed(profiler.output_path)
+        self.assertTrue(any("busy_work" in stack and stack.startswith("MainThread;") for stack in stacks))
+
+    def test_alloc(self) -> None:
+        profiler = AllocProfiler(output_path=self.output_dir / "alloc", top=5)
+        profiler.start()
+        chunks = busy_work()
+        summary = profiler.stop()
+        del chunks
+
+        self.assertEqual(profiler.output_path.suffix, ".collapsed")
+        self.assertIn("allocation sites", summary)
+        stacks = read_collapsed(profiler.output_path)
+        self.assertGreaterEqual(sum(weight for stack, weight in stacks.items() if __file__ in stack), 1024)
+
+
+class ProfileOptionTests(unittest.TestCase):
+    def test_wraps_async_subcommand(self) -> None:
+        from command.root import command
+
+        probe = types.ModuleType(PROBE_MODULE)
+        probe.__file__ = f"<{PROBE_MODULE}>"
+        exec(compile(textwrap.dedent(PROBE_CODE), probe.__file__, "exec"), probe.__dict__)
+        sys.modules[PROBE_MODULE] = probe
+        self.addCleanup(sys.modules.pop, PROBE_MODULE, None)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file_path = Path(temp_dir) / "config.toml"
+            config_file_path.write_text(CONFIG)
+            profile_dir = Path(temp_dir) / "profile"
+            args = ["-c", str(config_file_path), "--profile", "cpu", "--profile-dir", str(profile_dir)]
+            result = CliRunner().invoke(command, [*args, "script", "-m", "profile_probe"])
+
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("Profile written to", result.output)
+            (output_path,) = profile_dir.glob("script-cpu-*.pstats")
+            self.assertIn((probe.__file__, 5, "main"), pstats_functions(output_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
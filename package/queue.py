@@ -0,0 +1,593 @@
+import asyncio
+import dataclasses
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import secrets
+import signal
+import sqlite3
+import threading
+import time
+import traceback
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Sequence
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from typing import Final
+from typing import cast
+
+from package import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH: Final = "queue.sqlite3"
+DEFAULT_QUEUE: Final = "default"
+
+ResolveFunc = Callable[[str, str], Callable[..., Any]]
+
+JOB_DURATION = metrics.histogram("queue_job_duration_seconds", "Queue job run time.", ("queue",))
+JOB_RESULTS = metrics.counter("queue_jobs_total", "Queue jobs finished by result.", ("queue", "result"))
+
+_SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS job (
+    id INTEGER PRIMARY KEY,
+    queue TEXT NOT NULL,
+    module TEXT NOT NULL,
+    function TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    lease TEXT,
+    dead INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS job_ready ON job (queue, priority DESC, available_at) WHERE dead = 0;
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class Task:
+    module: str
+    function: str = "main"
+    args: Sequence[Any] = ()
+    kwargs: dict[str, Any] = dataclasses.field(default_factory=dict[str, Any])
+    priority: int = 0  # higher runs first
+    delay: float = 0.0  # seconds
+    max_attempts: int | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class Lease:
+    id: int
+    module: str
+    function: str
+    args: list[Any]
+    kwargs: dict[str, Any]
+    attempts: int
+    max_attempts: int
+    token: str
+
+
+@dataclasses.dataclass
+class QueueStats:
+    ready: int = 0
+    delayed: int = 0
+    leased: int = 0
+    dead: int = 0
+
+
+class Queue:
+    def __init__(
+        self,
+        path: Path,
+        name: str = DEFAULT_QUEUE,
+        *,
+        visibility_timeout: float = 30.0,
+        max_attempts: int = 5,
+        retry_backoff: float = 1.0,
+        retry_backoff_max: float = 300.0,
+        busy_timeout: float = 5.0,
+    ) -> None:
+        if visibility_timeout <= 0:
+            raise ValueError("Queue visibility_timeout must be > 0.")
+        if max_attempts < 1:
+            raise ValueError("Queue max_attempts must be >= 1.")
+        self.path = path
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self._busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # a forked child must not share the parent's sqlite handle
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self._busy_timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=wal")
+            connection.execute("PRAGMA synchronous=normal")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _transaction(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            connection = self._connect()
+            # IMMEDIATE takes the write lock up front so concurrent workers never lease the same row
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(connection)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+
+    def _row(self, task: Task, now: float) -> tuple[Any, ...]:
+        payload = json.dumps({"args": list(task.args), "kwargs": task.kwargs}, separators=(",", ":"))
+        return (
+            self.name,
+            task.module,
+            task.function,
+            payload,
+            task.priority,
+            task.max_attempts or self.max_attempts,
+            now + task.delay,
+            now,
+        )
+
+    def enqueue(self, task: Task) -> int:
+        row = self._row(task=task, now=time.time())
+        return self._transaction(
+            lambda connection: connection.execute(
+                "INSERT INTO job (queue, module, function, payload, priority, max_attempts, available_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            ).lastrowid
+        )
+
+    def enqueue_many(self, tasks: Iterable[Task]) -> int:
+        now = time.time()
+        rows = [self._row(task=task, now=now) for task in tasks]
+        self._transaction(
+            lambda connection: connection.executemany(
+                "INSERT INTO job (queue, module, function, payload, priority, max_attempts, available_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        )
+        return len(rows)
+
+    def dequeue(self, limit: int) -> list[Lease]:
+        if limit < 1:
+            return []
+
+        def lease(connection: sqlite3.Connection) -> list[Lease]:
+            now = time.time()
+            # a lease that expired on its last attempt (worker crashed or hung) must not run again
+            expired = connection.execute(
+                "UPDATE job SET dead = 1, lease = NULL, last_error = 'lease expired' "
+                "WHERE queue = ? AND dead = 0 AND available_at <= ? AND lease IS NOT NULL AND attempts >= max_attempts",
+                (self.name, now),
+            ).rowcount
+            if expired:
+                logger.error("Queue '%s': %d jobs gave up after their last lease expired.", self.name, expired)
+            rows = connection.execute(
+                "SELECT id, module, function, payload, attempts, max_attempts FROM job "
+                "WHERE queue = ? AND dead = 0 AND available_at <= ? "
+                "ORDER BY priority DESC, available_at, id LIMIT ?",
+                (self.name, now, limit),
+            ).fetchall()
+            if not rows:
+                return []
+            token = secrets.token_hex(8)
+            connection.executemany(
+                "UPDATE job SET attempts = attempts + 1, available_at = ?, lease = ? WHERE id = ?",
+                [(now + self.visibility_timeout, token, row[0]) for row in rows],
+            )
+            leases: list[Lease] = []
+            for job_id, module, function, payload, attempts, max_attempts in rows:
+                data = json.loads(payload)
+                leases.append(
+                    Lease(
+                        id=job_id,
+                        module=module,
+                        function=function,
+                        args=data["args"],
+                        kwargs=data["kwargs"],
+                        attempts=attempts + 1,
+                        max_attempts=max_attempts,
+                        token=token,
+                    )
+                )
+            return leases
+
+        return self._transaction(lease)
+
+    def complete(self, leases: Sequence[Lease]) -> int:
+        if not leases:
+            return 0
+        # the token check drops acks from a worker whose lease already expired and was handed out again
+        return self._transaction(
+            lambda connection: connection.executemany(
+                "DELETE FROM job WHERE id = ? AND lease = ?", [(lease.id, lease.token) for lease in leases]
+            ).rowcount
+        )
+
+    def retry_delay(self, attempts: int) -> float:
+        delay = min(self.retry_backoff_max, self.retry_backoff * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.0)
+
+    def fail(self, failures: Sequence[tuple[Lease, str]]) -> tuple[list[Lease], list[Lease]]:
+        # returns the (retried, dead) leases actually updated; a lease that moved on is left alone
+        if not failures:
+            return [], []
+        now = time.time()
+
+        def update(connection: sqlite3.Connection) -> tuple[list[Lease], list[Lease]]:
+            retried: list[Lease] = []
+            dead: list[Lease] = []
+            for lease, error in failures:
+                if lease.attempts < lease.max_attempts:
+                    cursor = connection.execute(
+                        "UPDATE job SET available_at = ?, lease = NULL, last_error = ? WHERE id = ? AND lease = ?",
+                        (now + self.retry_delay(lease.attempts), error, lease.id, lease.token),
+                    )
+                    if cursor.rowcount:
+                        retried.append(lease)
+                else:
+                    cursor = connection.execute(
+                        "UPDATE job SET dead = 1, lease = NULL, last_error = ? WHERE id = ? AND lease = ?",
+                        (error, lease.id, lease.token),
+                    )
+                    if cursor.rowcount:
+                        dead.append(lease)
+            return retried, dead
+
+        return self._transaction(update)
+
+    def extend(self, leases: Sequence[Lease]) -> None:
+        if leases:
+            available_at = time.time() + self.visibility_timeout
+            self._transaction(
+                lambda connection: connection.executemany(
+                    "UPDATE job SET available_at = ? WHERE id = ? AND lease = ?",
+                    [(available_at, lease.id, lease.token) for lease in leases],
+                )
+            )
+
+    def release(self, leases: Sequence[Lease]) -> int:
+        # hand unfinished jobs back without spending an attempt, e.g. on shutdown
+        if not leases:
+            return 0
+        now = time.time()
+        return self._transaction(
+            lambda connection: connection.executemany(
+                "UPDATE job SET available_at = ?, lease = NULL, attempts = attempts - 1 WHERE id = ? AND lease = ?",
+                [(now, lease.id, lease.token) for lease in leases],
+            ).rowcount
+        )
+
+    def stats(self) -> QueueStats:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT "
+                    "COALESCE(SUM(dead = 0 AND available_at <= :now), 0), "
+                    "COALESCE(SUM(dead = 0 AND available_at > :now AND lease IS NULL), 0), "
+                    "COALESCE(SUM(dead = 0 AND available_at > :now AND lease IS NOT NULL), 0), "
+                    "COALESCE(SUM(dead), 0) "
+                    "FROM job WHERE queue = :queue",
+                    {"now": time.time(), "queue": self.name},
+                )
+                .fetchone()
+            )
+        return QueueStats(ready=row[0], delayed=row[1], leased=row[2], dead=row[3])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+@dataclasses.dataclass(frozen=True)
+class Settings:
+    path: str = DEFAULT_PATH
+    visibility_timeout: float = 30.0
+    max_attempts: int = 5
+    retry_backoff: float = 1.0
+    retry_backoff_max: float = 300.0
+
+
+_settings = Settings()
+_queues: dict[str, Queue] = {}
+_queues_lock = threading.Lock()
+
+
+def configure(
+    path: str = DEFAULT_PATH,
+    visibility_timeout: float = 30.0,
+    max_attempts: int = 5,
+    retry_backoff: float = 1.0,
+    retry_backoff_max: float = 300.0,
+) -> None:
+    global _settings
+    settings = Settings(
+        path=path,
+        visibility_timeout=visibility_timeout,
+        max_attempts=max_attempts,
+        retry_backoff=retry_backoff,
+        retry_backoff_max=retry_backoff_max,
+    )
+    with _queues_lock:
+        if settings == _settings:
+            return
+        _settings = settings
+        for queue in _queues.values():
+            queue.close()
+        _queues.clear()
+
+
+def get(name: str = DEFAULT_QUEUE) -> Queue:
+    with _queues_lock:
+        queue = _queues.get(name)
+        if queue is None:
+            queue = _queues[name] = Queue(
+                path=Path(_settings.path),
+                name=name,
+                visibility_timeout=_settings.visibility_timeout,
+                max_attempts=_settings.max_attempts,
+                retry_backoff=_settings.retry_backoff,
+                retry_backoff_max=_settings.retry_backoff_max,
+            )
+        return queue
+
+
+def enqueue(
+    module: str,
+    function: str = "main",
+    args: Sequence[Any] = (),
+    kwargs: dict[str, Any] | None = None,
+    *,
+    queue: str = DEFAULT_QUEUE,
+    priority: int = 0,
+    delay: float = 0.0,
+    max_attempts: int | None = None,
+) -> int:
+    task = Task(
+        module=module,
+        function=function,
+        args=args,
+        kwargs=kwargs or {},
+        priority=priority,
+        delay=delay,
+        max_attempts=max_attempts,
+    )
+    return get(name=queue).enqueue(task=task)
+
+
+def close() -> None:
+    with _queues_lock:
+        for queue in _queues.values():
+            queue.close()
+        _queues.clear()
+
+
+@dataclasses.dataclass
+class WorkerStats:
+    succeeded: int = 0
+    retried: int = 0
+    dead: int = 0
+    released: int = 0
+
+
+class Worker:
+    def __init__(
+        self,
+        queue: Queue,
+        resolve: ResolveFunc,
+        *,
+        concurrency: int = 8,
+        batch_size: int = 32,
+        poll_interval: float = 1.0,
+        thread_pool_size: int = 8,
+        shutdown_timeout: float = 30.0,
+        burst: bool = False,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("Worker concurrency must be >= 1.")
+        if batch_size < 1:
+            raise ValueError("Worker batch_size must be >= 1.")
+        self.queue = queue
+        self.stats = WorkerStats()
+        self._resolve = resolve
+        self._concurrency = concurrency
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._thread_pool_size = thread_pool_size
+        self._shutdown_timeout = shutdown_timeout
+        self._burst = burst
+        self._running: dict[asyncio.Task[None], Lease] = {}
+        self._threads: dict[int, Future[Any]] = {}  # lease id -> executor future of a sync job
+        self._completed: list[Lease] = []
+        self._failed: list[tuple[Lease, str]] = []
+        self._stopped = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._duration = JOB_DURATION.labels(queue.name)
+        self._succeeded = JOB_RESULTS.labels(queue.name, "success")
+        self._retried = JOB_RESULTS.labels(queue.name, "retry")
+        self._dead = JOB_RESULTS.labels(queue.name, "dead")
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self.stop)
+
+        executor = ThreadPoolExecutor(max_workers=self._thread_pool_size, thread_name_prefix="worker")
+        heartbeat = asyncio.create_task(self._heartbeat_loop(), name="worker-heartbeat")
+        logger.info("Worker started on queue '%s' (%s).", self.queue.name, self.queue.path)
+        try:
+            await self._fetch_loop(executor=executor)
+        finally:
+            try:
+                # the heartbeat keeps draining jobs leased until they finish or are released
+                await self._drain()
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            await self._flush()
+
+            executor.shutdown(wait=False, cancel_futures=True)
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(signum)
+            self.report()
+
+    async def _drain(self) -> None:
+        running = list(self._running)
+        if not running:
+            return
+        logger.info("Waiting up to %.1fs for %d running jobs.", self._shutdown_timeout, len(running))
+        _, pending = await asyncio.wait(running, timeout=self._shutdown_timeout)
+        unfinished: list[Lease] = []
+        busy: list[Lease] = []
+        for task in pending:
+            lease = self._running[task]
+            future = self._threads.get(lease.id)
+            # a thread cannot be interrupted; releasing its job would let it run twice at once
+            if future is not None and not future.cancel():
+                busy.append(lease)
+            else:
+                unfinished.append(lease)
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        if busy:
+            logger.warning("Leaving %d jobs still running on threads leased until their lease expires.", len(busy))
+        self.stats.released += await asyncio.to_thread(self.queue.release, unfinished)
+
+    async def _fetch_loop(self, executor: ThreadPoolExecutor) -> None:
+        while not self._stopped.is_set():
+            # acks and retries ride along with the next fetch instead of one transaction per job
+            await self._flush()
+            free = self._concurrency - len(self._running)
+            leases = await asyncio.to_thread(self.queue.dequeue, min(free, self._batch_size)) if free > 0 else []
+            for lease in leases:
+                task = asyncio.create_task(self._execute(lease=lease, executor=executor), name=f"job-{lease.id}")
+                self._running[task] = lease
+                task.add_done_callback(self._finished)
+
+            if leases and len(self._running) < self._concurrency:
+                continue
+            if not leases and not self._running and self._burst:
+                return
+            self._wakeup.clear()
+            try:
+                timeout = self._poll_interval if not leases and free > 0 else None
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    def _finished(self, task: "asyncio.Task[None]") -> None:
+        self._running.pop(task, None)
+        self._wakeup.set()
+
+    async def _execute(self, lease: Lease, executor: ThreadPoolExecutor) -> None:
+        started_at = time.perf_counter()
+        try:
+            func = self._resolve(lease.module, lease.function)
+            if inspect.iscoroutinefunction(func):
+                await cast(Callable[..., Awaitable[Any]], func)(*lease.args, **lease.kwargs)
+            else:
+                future = executor.submit(functools.partial(func, *lease.args, **lease.kwargs))
+                self._threads[lease.id] = future
+                try:
+                    await asyncio.wrap_future(future)
+                finally:
+                    self._threads.pop(lease.id, None)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as exc:
+            # a job calling sys.exit() or raising KeyboardInterrupt fails that job, not the worker
+            logger.warning(
+                "Job %d %s.%s failed (attempt %d/%d): %s",
+                lease.id,
+                lease.module,
+                lease.function,
+                lease.attempts,
+                lease.max_attempts,
+                exc,
+            )
+            self._failed.append((lease, "".join(traceback.format_exception(exc)).strip()))
+        else:
+            self._completed.append(lease)
+        finally:
+            self._duration.observe(time.perf_counter() - started_at)
+
+    async def _flush(self) -> None:
+        completed, self._completed = self._completed, []
+        failed, self._failed = self._failed, []
+        # count what the queue applied; a result for an expired lease belongs to whoever holds it now
+        if completed:
+            succeeded = await asyncio.to_thread(self.queue.complete, completed)
+            self.stats.succeeded += succeeded
+            self._succeeded.inc(succeeded)
+        if failed:
+            retried, dead = await asyncio.to_thread(self.queue.fail, failed)
+            for lease in dead:
+                logger.error("Job %d %s.%s gave up after %d attempts.", lease.id, lease.module, lease.function, lease.attempts)
+            self.stats.dead += len(dead)
+            self.stats.retried += len(retried)
+            self._dead.inc(len(dead))
+            self._retried.inc(len(retried))
+
+    async def _heartbeat_loop(self) -> None:
+        # keep long jobs leased; a crashed worker stops extending and its jobs become visible again
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            leases = list(self._running.values())
+            if leases:
+                await asyncio.to_thread(self.queue.extend, leases)
+
+    def report(self) -> None:
+        logger.info(
+            "Worker on queue '%s': succeeded=%d retried=%d dead=%d released=%d",
+            self.queue.name,
+            self.stats.succeeded,
+            self.stats.retried,
+            self.stats.dead,
+            self.stats.released,
+        )
+
+
+__all__ = [
+    "Lease",
+    "Queue",
+    "QueueStats",
+    "Task",
+    "Worker",
+    "WorkerStats",
+    "close",
+    "configure",
+    "enqueue",
+    "get",
+]
@@ -0,0 +1,231 @@
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from package.queue import Queue
+from package.queue import Task
+from package.queue import Worker
+
+
+class QueueTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "queue.sqlite3"
+        self.queue = self.open(visibility_timeout=0.1, retry_backoff=0.05)
+
+    def open(self, **kwargs: Any) -> Queue:
+        queue = Queue(path=self.path, **kwargs)
+        self.addCleanup(queue.close)
+        return queue
+
+    def test_priority_and_delay(self) -> None:
+        self.queue.enqueue_many(
+            [
+                Task(module="m", args=(1,)),
+                Task(module="m", args=(2,), priority=5),
+                Task(module="m", args=(3,), delay=60),
+                Task(module="m", args=(4,), priority=5),
+            ]
+        )
+        leases = self.queue.dequeue(limit=10)
+        self.assertEqual([lease.args for lease in leases], [[2], [4], [1]])
+        self.assertEqual(self.queue.stats().delayed, 1)
+        self.assertEqual(self.queue.stats().leased, 3)
+
+        self.queue.complete(leases)
+        stats = self.queue.stats()
+        self.assertEqual((stats.ready, stats.leased, stats.delayed), (0, 0, 1))
+
+    def test_queues_are_separate(self) -> None:
+        other = self.open(name="other")
+        other.enqueue(Task(module="m", kwargs={"x": 1}))
+        self.assertEqual(self.queue.dequeue(limit=10), [])
+        self.assertEqual(other.dequeue(limit=10)[0].kwargs, {"x": 1})
+
+    def test_visibility_timeout(self) -> None:
+        self.queue.enqueue(Task(module="m"))
+        first = self.queue.dequeue(limit=1)
+        self.assertEqual(self.queue.dequeue(limit=1), [])
+
+        time.sleep(0.15)
+        second = self.queue.dequeue(limit=1)
+        self.assertEqual([lease.attempts for lease in first + second], [1, 2])
+
+        # the expired lease can no longer ack the redelivered job
+        self.assertEqual(self.queue.complete(first), 0)
+        self.assertEqual(self.queue.fail([(first[0], "late")]), ([], []))
+        self.assertEqual(self.queue.stats().leased, 1)
+        self.assertEqual(self.queue.complete(second), 1)
+        self.assertEqual(self.queue.stats().leased, 0)
+
+    def test_expired_last_attempt_goes_dead(self) -> None:
+        self.queue.enqueue(Task(module="m", max_attempts=1))
+        self.assertEqual(len(self.queue.dequeue(limit=1)), 1)
+
+        time.sleep(0.15)
+        self.assertEqual(self.queue.dequeue(limit=1), [])
+        self.assertEqual(self.queue.stats().dead, 1)
+        with sqlite3.connect(self.path) as connection:
+            self.assertEqual(connection.execute("SELECT last_error FROM job").fetchall(), [("lease expired",)])
+
+    def test_retry_then_dead(self) -> None:
+        self.queue.enqueue(Task(module="m", max_attempts=2))
+        lease = self.queue.dequeue(limit=1)[0]
+        self.assertEqual(self.queue.fail([(lease, "first")]), ([lease], []))
+        self.assertEqual(self.queue.dequeue(limit=1), [])
+
+        time.sleep(0.06)
+        lease = self.queue.dequeue(limit=1)[0]
+        self.assertEqual(self.queue.fail([(lease, "second")]), ([], [lease]))
+        time.sleep(0.06)
+        self.assertEqual(self.queue.dequeue(limit=1), [])
+        self.assertEqual(self.queue.stats().dead, 1)
+
+    def test_release_keeps_attempts(self) -> None:
+        self.queue.enqueue(Task(module="m"))
+        self.queue.release(self.queue.dequeue(limit=1))
+        self.assertEqual(self.queue.dequeue(limit=1)[0].attempts, 1)
+
+
+class QueueConfigTests(unittest.TestCase):
+    def test_checks_run_in_validation_mode_without_configure(self) -> None:
+        from internal.config.queue import Queue as QueueConfig
+
+        with mock.patch("package.queue.configure") as configure:
+            errors = QueueConfig.validate({"visibility_timeout": 0})
+            self.assertEqual([str(error) for error in errors], ["queue.visibility_timeout must be > 0"])
+            errors = QueueConfig.validate({"batch_size": 0, "max_attempts": 0})
+            self.assertEqual(
+                [str(error) for error in errors],
+                ["queue.max_attempts must be >= 1", "queue.concurrency and queue.batch_size must be >= 1"],
+            )
+            config = QueueConfig.from_mapping({"max_attempts": 2})
+            configure.assert_not_called()
+
+            config.apply()
+        self.assertEqual(configure.call_args.kwargs["max_attempts"], 2)
+
+
+class WorkerTests(unittest.TestCase):
+    def test_burst(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            queue = Queue(path=Path(temp_dir) / "queue.sqlite3", retry_backoff=0.01)
+            self.addCleanup(queue.close)
+            calls: list[Any] = []
+
+            def record(value: int) -> None:
+                calls.append(value)
+
+            async def record_async(value: int) -> None:
+                await asyncio.sleep(0)
+                calls.append(value)
+
+            def broken() -> None:
+                raise RuntimeError("broken")
+
+            functions: dict[str, Callable[..., Any]] = {"record": record, "record_async": record_async, "broken": broken}
+            queue.enqueue_many([Task(module="m", function="record", args=(idx,)) for idx in range(50)])
+            queue.enqueue(Task(module="m", function="record_async", kwargs={"value": 50}))
+            queue.enqueue(Task(module="m", function="broken", max_attempts=1))
+
+            worker = Worker(queue=queue, resolve=lambda _, name: functions[name], concurrency=4, batch_size=8, burst=True)
+            asyncio.run(worker.run())
+
+            self.assertEqual(sorted(calls), list(range(51)))
+            self.assertEqual((worker.stats.succeeded, worker.stats.dead), (51, 1))
+            stats = queue.stats()
+            self.assertEqual((stats.ready, stats.leased, stats.dead), (0, 0, 1))
+
+    def test_base_exceptions_fail_the_job(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            queue = Queue(path=Path(temp_dir) / "queue.sqlite3")
+            self.addCleanup(queue.close)
+            calls: list[int] = []
+
+            def record(value: int) -> None:
+                calls.append(value)
+
+            def exit_thread() -> None:
+                sys.exit("job gave up")
+
+            async def interrupt() -> None:
+                raise KeyboardInterrupt
+
+            functions: dict[str, Callable[..., Any]] = {"record": record, "exit": exit_thread, "interrupt": interrupt}
+            queue.enqueue(Task(module="m", function="exit", max_attempts=1))
+            queue.enqueue(Task(module="m", function="interrupt", max_attempts=1))
+            queue.enqueue_many([Task(module="m", function="record", args=(idx,)) for idx in range(3)])
+
+            worker = Worker(queue=queue, resolve=lambda _, name: functions[name], concurrency=1, batch_size=1, burst=True)
+            asyncio.run(worker.run())
+
+            self.assertEqual(calls, [0, 1, 2])
+            self.assertEqual((worker.stats.succeeded, worker.stats.dead), (3, 2))
+            self.assertEqual(queue.stats().dead, 2)
+
+    def run_until_stopped(self, worker: Worker, started: threading.Event) -> None:
+        async def main() -> None:
+            run = asyncio.create_task(worker.run())
+            await asyncio.to_thread(started.wait, 5)
+            worker.stop()
+            await run
+
+        asyncio.run(main())
+
+    def test_heartbeat_covers_drain(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            queue = Queue(path=Path(temp_dir) / "queue.sqlite3", visibility_timeout=0.15)
+            self.addCleanup(queue.close)
+            started = threading.Event()
+            leased_during_drain: list[int] = []
+
+            async def slow() -> None:
+                started.set()
+                await asyncio.sleep(0.4)
+                leased_during_drain.append(queue.stats().leased)
+
+            queue.enqueue(Task(module="m", function="slow"))
+            worker = Worker(queue=queue, resolve=lambda _, __: slow, shutdown_timeout=5)
+            self.run_until_stopped(worker=worker, started=started)
+
+            self.assertEqual(leased_during_drain, [1])
+            self.assertEqual((worker.stats.succeeded, worker.stats.released), (1, 0))
+            self.assertEqual(queue.stats().leased, 0)
+
+    def test_shutdown_keeps_running_thread_jobs_leased(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            queue = Queue(path=Path(temp_dir) / "queue.sqlite3")
+            self.addCleanup(queue.close)
+            started = threading.Event()
+            finish = threading.Event()
+            self.addCleanup(finish.set)
+
+            def blocking() -> None:
+                started.set()
+                finish.wait(5)
+
+            async def waiting() -> None:
+                await asyncio.sleep(5)
+
+            functions: dict[str, Callable[..., Any]] = {"blocking": blocking, "waiting": waiting}
+            queue.enqueue_many([Task(module="m", function="blocking"), Task(module="m", function="waiting")])
+            worker = Worker(queue=queue, resolve=lambda _, name: functions[name], shutdown_timeout=0.05)
+            self.run_until_stopped(worker=worker, started=started)
+
+            # the async job is handed back; the thread still owns the sync one
+            self.assertEqual(worker.stats.released, 1)
+            stats = queue.stats()
+            self.assertEqual((stats.ready, stats.leased), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,485 @@
+import abc
+import asyncio
+import atexit
+import contextlib
+import dataclasses
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncGenerator
+from collections.abc import Callable
+from collections.abc import Generator
+from typing import Any
+from typing import Final
+from typing import Generic
+from typing import Literal
+from typing import TypeVar
+from typing import dataclass_transform
+from typing import get_args
+
+from package import metrics
+from package.config import Config
+from package.config import ConfigMeta
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SQLiteJournalMode = Literal["delete", "truncate", "persist", "memory", "wal", "off"]
+SQLITE_JOURNAL_MODES: Final = frozenset(get_args(SQLiteJournalMode))
+
+POOL_WAIT = metrics.histogram("resource_pool_wait_seconds", "Time to acquire a pooled resource.", ("pool",))
+POOL_TIMEOUTS = metrics.counter("resource_pool_timeouts_total", "Pool acquires that timed out.", ("pool",))
+
+
+class PoolTimeout(TimeoutError):
+    pass
+
+
+class PoolClosed(RuntimeError):
+    pass
+
+
+@dataclasses.dataclass
+class PoolStats:
+    size: int = 0
+    idle: int = 0
+    created: int = 0
+    closed: int = 0
+    acquired: int = 0
+    waits: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    @property
+    def in_use(self) -> int:
+        return self.size - self.idle
+
+
+class Pool(Generic[T]):
+    def __init__(
+        self,
+        name: str,
+        create: Callable[[], T],
+        close: Callable[[T], Any],
+        *,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        acquire_timeout: float = 30.0,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f"Pool '{name}' max_size must be >= 1.")
+        self.name = name
+        self._create = create
+        self._close = close
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._acquire_timeout = acquire_timeout
+
+        self._condition = threading.Condition()
+        # coroutines wait on loop futures instead of parking an executor thread in Condition.wait
+        self._async_waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = deque()
+        self._idle: deque[tuple[T, float]] = deque()
+        self._stats = PoolStats()
+        self._closed = False
+        self._wait_metric = POOL_WAIT.labels(name)
+        self._timeout_metric = POOL_TIMEOUTS.labels(name)
+
+    @property
+    def stats(self) -> PoolStats:
+        with self._condition:
+            self._stats.idle = len(self._idle)
+            return dataclasses.replace(self._stats)
+
+    def _prune_locked(self, now: float) -> list[T]:
+        expired: list[T] = []
+        while self._idle and now - self._idle[0][1] >= self._idle_timeout:
+            expired.append(self._idle.popleft()[0])
+        self._stats.size -= len(expired)
+        return expired
+
+    def _close_items(self, items: list[T]) -> None:
+        for item in items:
+            try:
+                self._close(item)
+            except Exception:
+                logger.exception("Pool '%s' failed to close a resource.", self.name)
+        if items:
+            with self._condition:
+                self._stats.closed += len(items)
+
+    @staticmethod
+    def _wake(waiter: "asyncio.Future[None]") -> None:
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def _notify_async_locked(self, count: int = 1) -> None:
+        while count > 0 and self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(self._wake, waiter)
+            except RuntimeError:
+                continue  # the waiter's loop is closed
+            count -= 1
+
+    def _notify_locked(self) -> None:
+        self._condition.notify()
+        self._notify_async_locked()
+
+    def _checkout(self, timeout: float | None) -> T:
+        timeout = self._acquire_timeout if timeout is None else timeout
+        started_at = time.monotonic()
+        deadline = started_at + timeout
+        waited = False
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolClosed(f"Pool '{self.name}' is closed.")
+                now = time.monotonic()
+                expired = self._prune_locked(now=now)
+                if expired:
+                    self._condition.release()
+                    try:
+                        self._close_items(expired)
+                    finally:
+                        self._condition.acquire()
+                    continue
+
+                if self._idle:
+                    item, _ = self._idle.pop()
+                    self._record_acquire_locked(started_at=started_at, waited=waited)
+                    return item
+
+                if self._stats.size < self._max_size:
+                    self._stats.size += 1
+                    break
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats.timeouts += 1
+                    self._timeout_metric.inc()
+                    raise PoolTimeout(f"Pool '{self.name}' acquire timed out after {timeout:.3f}s.")
+                waited = True
+                self._condition.wait(remaining)
+
+        try:
+            item = self._create()
+        except BaseException:
+            with self._condition:
+                self._stats.size -= 1
+                self._notify_locked()
+            raise
+
+        with self._condition:
+            self._stats.created += 1
+            self._record_acquire_locked(started_at=started_at, waited=waited)
+        return item
+
+    def _record_acquire_locked(self, started_at: float, waited: bool) -> None:
+        self._stats.acquired += 1
+        wait_seconds = time.monotonic() - started_at
+        self._wait_metric.observe(wait_seconds)
+        if waited:
+            self._stats.waits += 1
+            self._stats.wait_seconds_total += wait_seconds
+            self._stats.wait_seconds_max = max(self._stats.wait_seconds_max, wait_seconds)
+
+    def _release(self, item: T, discard: bool) -> None:
+        with self._condition:
+            if discard or self._closed:
+                self._stats.size -= 1
+            else:
+                self._idle.append((item, time.monotonic()))
+            self._notify_locked()
+        if discard or self._closed:
+            self._close_items([item])
+
+    @contextlib.contextmanager
+    def acquire(self, timeout: float | None = None) -> Generator[T, None, None]:
+        item = self._checkout(timeout=timeout)
+        try:
+            yield item
+        except BaseException:
+            self._release(item=item, discard=True)
+            raise
+        self._release(item=item, discard=False)
+
+    def _release_result(self, future: "asyncio.Future[T]") -> None:
+        if not future.cancelled() and future.exception() is None:
+            self._release(item=future.result(), discard=False)
+
+    async def _wait_async(self, loop: asyncio.AbstractEventLoop, timeout: float) -> None:
+        waiter: asyncio.Future[None] = loop.create_future()
+        entry = (loop, waiter)
+        self._async_waiters.append(entry)
+        self._condition.release()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except TimeoutError:
+            pass
+        finally:
+            self._condition.acquire()
+            if entry in self._async_waiters:
+                self._async_waiters.remove(entry)
+            elif waiter.cancelled() or not waiter.done():
+                # woken but leaving without a retry, so hand the wakeup to the next waiter
+                self._notify_async_locked()
+
+    async def _checkout_async(self, timeout: float | None) -> T:
+        timeout = self._acquire_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        started_at = time.monotonic()
+        deadline = started_at + timeout
+        waited = False
+
+        self._condition.acquire()
+        try:
+            while True:
+                if self._closed:
+                    raise PoolClosed(f"Pool '{self.name}' is closed.")
+                now = time.monotonic()
+                expired = self._prune_locked(now=now)
+                if expired:
+                    self._condition.release()
+                    try:
+                        await asyncio.to_thread(self._close_items, expired)
+                    finally:
+                        self._condition.acquire()
+                    continue
+
+                if self._idle:
+                    item, _ = self._idle.pop()
+                    self._record_acquire_locked(started_at=started_at, waited=waited)
+                    return item
+
+                if self._stats.size < self._max_size:
+                    self._stats.size += 1
+                    break
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats.timeouts += 1
+                    self._timeout_metric.inc()
+                    raise PoolTimeout(f"Pool '{self.name}' acquire timed out after {timeout:.3f}s.")
+                waited = True
+                await self._wait_async(loop=loop, timeout=remaining)
+        finally:
+            self._condition.release()
+
+        # only create() may block, so only it runs on a thread
+        future = asyncio.ensure_future(asyncio.to_thread(self._create))
+        try:
+            item = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(self._release_result)
+            raise
+        except BaseException:
+            with self._condition:
+                self._stats.size -= 1
+                self._notify_locked()
+            raise
+
+        with self._condition:
+            self._stats.created += 1
+            self._record_acquire_locked(started_at=started_at, waited=waited)
+        return item
+
+    @contextlib.asynccontextmanager
+    async def acquire_async(self, timeout: float | None = None) -> AsyncGenerator[T, None]:
+        item = await self._checkout_async(timeout=timeout)
+        try:
+            yield item
+        except BaseException:
+            self._release(item=item, discard=True)
+            raise
+        self._release(item=item, discard=False)
+
+    def prune(self) -> None:
+        with self._condition:
+            expired = self._prune_locked(now=time.monotonic())
+        self._close_items(expired)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            items = [item for item, _ in self._idle]
+            self._idle.clear()
+            self._stats.size -= len(items)
+            self._condition.notify_all()
+            self._notify_async_locked(count=len(self._async_waiters))
+        self._close_items(items)
+
+
+PoolFactory = Callable[[], Pool[Any]]
+
+
+class Registry:
+    def __init__(self, reap_interval: float = 10.0) -> None:
+        self._lock = threading.Lock()
+        self._factories: dict[str, PoolFactory] = {}
+        self._pools: dict[str, Pool[Any]] = {}
+        self._close_hooks: list[Callable[[], Any]] = []
+        self._reap_interval = reap_interval
+        self._reaper_stopped: threading.Event | None = None
+
+    def _start_reaper_locked(self) -> None:
+        # checkout prunes lazily; the reaper closes idle_timeout-expired items of pools nobody acquires from
+        if self._reaper_stopped is None:
+            stopped = self._reaper_stopped = threading.Event()
+            threading.Thread(target=self._reap, args=(stopped,), name="resource-reaper", daemon=True).start()
+
+    def _reap(self, stopped: threading.Event) -> None:
+        while not stopped.wait(self._reap_interval):
+            with self._lock:
+                pools = list(self._pools.values())
+            for pool in pools:
+                pool.prune()
+
+    def register(self, name: str, factory: PoolFactory) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            pool = self._pools.pop(name, None)
+        if pool is not None:
+            pool.close()
+
+    def get(self, name: str) -> Pool[Any]:
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                factory = self._factories.get(name)
+                if factory is None:
+                    available = ", ".join(sorted(self._factories)) or "<none>"
+                    raise KeyError(f"Resource '{name}' is not registered. Available: {available}")
+                pool = self._pools[name] = factory()
+                self._start_reaper_locked()
+            return pool
+
+    def stats(self) -> dict[str, PoolStats]:
+        with self._lock:
+            pools = dict(self._pools)
+        return {name: pool.stats for name, pool in pools.items()}
+
+    def on_close(self, hook: Callable[[], Any]) -> None:
+        with self._lock:
+            self._close_hooks.append(hook)
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            hooks = list(reversed(self._close_hooks))
+            self._pools.clear()
+            self._close_hooks.clear()
+            if self._reaper_stopped is not None:
+                self._reaper_stopped.set()
+                self._reaper_stopped = None
+        for hook in hooks:
+            try:
+                hook()
+            except Exception:
+                logger.exception("Resource close hook failed.")
+        for pool in pools:
+            pool.close()
+
+    def _forget(self) -> None:
+        # Inherited pools belong to the parent process; the child lazily builds its own.
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._close_hooks = []
+        self._reaper_stopped = None  # threads do not survive fork
+
+
+registry = Registry()
+atexit.register(registry.close)
+os.register_at_fork(after_in_child=registry._forget)  # pyright: ignore[reportPrivateUsage]
+
+
+def acquire(name: str, timeout: float | None = None) -> contextlib.AbstractContextManager[Any]:
+    return registry.get(name).acquire(timeout=timeout)
+
+
+def acquire_async(name: str, timeout: float | None = None) -> contextlib.AbstractAsyncContextManager[Any]:
+    return registry.get(name).acquire_async(timeout=timeout)
+
+
+@dataclass_transform(kw_only_default=True, field_specifiers=(dataclasses.field,))
+class PoolConfigMeta(ConfigMeta, abc.ABCMeta):
+    pass
+
+
+class PoolConfig(Config, metaclass=PoolConfigMeta):
+    max_size: int = dataclasses.field(default=10)
+    idle_timeout: float = dataclasses.field(default=300.0)
+    acquire_timeout: float = dataclasses.field(default=30.0)
+
+    @abc.abstractmethod
+    def create_pool(self, name: str) -> Pool[Any]: ...
+
+
+class SQLitePoolConfig(PoolConfig):
+    path: str
+    busy_timeout: float = dataclasses.field(default=5.0)
+    journal_mode: SQLiteJournalMode = dataclasses.field(default="wal")
+
+    def connect(self) -> sqlite3.Connection:
+        # PRAGMA takes no bound parameters, so only a known mode may reach the SQL text
+        if self.journal_mode not in SQLITE_JOURNAL_MODES:
+            raise ValueError(f"Unknown SQLite journal_mode: {self.journal_mode!r}")
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+        connection.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        return connection
+
+    def create_pool(self, name: str) -> Pool[sqlite3.Connection]:
+        return Pool(
+            name=name,
+            create=self.connect,
+            close=sqlite3.Connection.close,
+            max_size=self.max_size,
+            idle_timeout=self.idle_timeout,
+            acquire_timeout=self.acquire_timeout,
+        )
+
+
+class UnixSocketPoolConfig(PoolConfig):
+    path: str
+    connect_timeout: float = dataclasses.field(default=5.0)
+
+    def connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def create_pool(self, name: str) -> Pool[socket.socket]:
+        return Pool(
+            name=name,
+            create=self.connect,
+            close=socket.socket.close,
+            max_size=self.max_size,
+            idle_timeout=self.idle_timeout,
+            acquire_timeout=self.acquire_timeout,
+        )
+
+
+__all__ = [
+    "Pool",
+    "PoolClosed",
+    "PoolConfig",
+    "PoolStats",
+    "PoolTimeout",
+    "Registry",
+    "SQLitePoolConfig",
+    "UnixSocketPoolConfig",
+    "acquire",
+    "acquire_async",
+    "registry",
+]
@@ -0,0 +1,252 @@
+import asyncio
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import package
+from package.resource import Pool
+from package.resource import PoolClosed
+from package.resource import PoolTimeout
+from package.resource import Registry
+from package.resource import SQLitePoolConfig
+from package.resource import UnixSocketPoolConfig
+
+
+class PoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.db_path = str(Path(self.temp_dir.name) / "pool.sqlite3")
+
+    def sqlite_pool(self, **kwargs: float) -> Pool[sqlite3.Connection]:
+        return SQLitePoolConfig.from_mapping({"path": self.db_path, **kwargs}).create_pool("db")
+
+    def test_reuse_connection(self) -> None:
+        pool = self.sqlite_pool()
+        with pool.acquire() as first:
+            first.execute("CREATE TABLE item (id INTEGER)")
+        with pool.acquire() as second:
+            self.assertIs(first, second)
+        self.assertEqual(pool.stats.created, 1)
+        self.assertEqual(pool.stats.acquired, 2)
+        pool.close()
+        self.assertEqual(pool.stats.closed, 1)
+        with self.assertRaises(PoolClosed):
+            with pool.acquire():
+                pass
+
+    def test_acquire_timeout_and_wait_stats(self) -> None:
+        pool = self.sqlite_pool(max_size=1, acquire_timeout=0.05)
+        with pool.acquire():
+            with self.assertRaises(PoolTimeout):
+                with pool.acquire():
+                    pass
+
+        holder_ready = threading.Event()
+
+        def hold() -> None:
+            with pool.acquire():
+                holder_ready.set()
+                time.sleep(0.1)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        holder_ready.wait()
+        with pool.acquire(timeout=1.0):
+            pass
+        thread.join()
+
+        stats = pool.stats
+        self.assertEqual(stats.timeouts, 1)
+        self.assertEqual(stats.waits, 1)
+        self.assertGreater(stats.wait_seconds_max, 0.0)
+        self.assertEqual(stats.created, 1)
+        pool.close()
+
+    def test_idle_timeout_and_discard_on_error(self) -> None:
+        pool = self.sqlite_pool(idle_timeout=0.01)
+        with pool.acquire() as first:
+            pass
+        time.sleep(0.02)
+        with pool.acquire() as second:
+            self.assertIsNot(first, second)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            with pool.acquire() as connection:
+                connection.execute("SELECT * FROM missing")
+        self.assertEqual(pool.stats.size, 0)
+        self.assertEqual(pool.stats.closed, 2)
+        pool.close()
+
+    def test_acquire_async_limits_concurrency(self) -> None:
+        pool = self.sqlite_pool(max_size=2)
+        active = 0
+        peak = 0
+
+        async def work() -> None:
+            nonlocal active, peak
+            async with pool.acquire_async() as connection:
+                active += 1
+                peak = max(peak, active)
+                connection.execute("SELECT 1")
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        async def main() -> None:
+            await asyncio.gather(*(work() for _ in range(10)))
+
+        asyncio.run(main())
+        self.assertEqual(peak, 2)
+        self.assertEqual(pool.stats.created, 2)
+        self.assertEqual(pool.stats.acquired, 10)
+        pool.close()
+
+    def test_async_waiters_do_not_hold_threads(self) -> None:
+        pool = self.sqlite_pool(max_size=1)
+        held = threading.Event()
+        release = threading.Event()
+
+        def hold() -> None:
+            with pool.acquire():
+                held.set()
+                release.wait()
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        held.wait()
+
+        async def waiter() -> None:
+            async with pool.acquire_async(timeout=5):
+                pass
+
+        async def main() -> float:
+            # more waiters than the default executor has threads
+            waiters = [asyncio.create_task(waiter()) for _ in range(64)]
+            await asyncio.sleep(0.01)
+            started_at = time.monotonic()
+            await asyncio.wait_for(asyncio.to_thread(lambda: None), 1)
+            elapsed = time.monotonic() - started_at
+            release.set()
+            await asyncio.gather(*waiters)
+            return elapsed
+
+        self.assertLess(asyncio.run(main()), 0.5)
+        holder.join()
+        self.assertEqual(pool.stats.acquired, 65)
+        self.assertEqual(pool.stats.in_use, 0)
+        pool.close()
+
+    def test_async_acquire_timeout_and_close(self) -> None:
+        pool = self.sqlite_pool(max_size=1)
+
+        async def main() -> None:
+            async with pool.acquire_async():
+                with self.assertRaises(PoolTimeout):
+                    async with pool.acquire_async(timeout=0.02):
+                        pass
+                blocked = asyncio.create_task(pool.acquire_async(timeout=5).__aenter__())
+                await asyncio.sleep(0.01)
+                await asyncio.to_thread(pool.close)
+                with self.assertRaises(PoolClosed):
+                    await blocked
+
+        asyncio.run(main())
+        self.assertEqual(pool.stats.timeouts, 1)
+
+    def test_unix_socket_pool(self) -> None:
+        socket_path = str(Path(self.temp_dir.name) / "echo.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(socket_path)
+        server.listen()
+        self.addCleanup(server.close)
+
+        def echo() -> None:
+            conn, _ = server.accept()
+            with conn:
+                while data := conn.recv(1024):
+                    conn.sendall(data)
+
+        threading.Thread(target=echo, daemon=True).start()
+        pool = UnixSocketPoolConfig.from_mapping({"path": socket_path}).create_pool("echo")
+        for payload in (b"a", b"b"):
+            with pool.acquire() as sock:
+                sock.sendall(payload)
+                self.assertEqual(sock.recv(1024), payload)
+        self.assertEqual(pool.stats.created, 1)
+        pool.close()
+
+    def test_wait_metrics_are_published(self) -> None:
+        pool = SQLitePoolConfig.from_mapping({"path": self.db_path, "max_size": 1}).create_pool("metrics_db")
+        with pool.acquire():
+            with self.assertRaises(PoolTimeout):
+                with pool.acquire(timeout=0.01):
+                    pass
+        pool.close()
+
+        exposition = package.metrics.registry.exposition()
+        self.assertIn('resource_pool_wait_seconds_count{pool="metrics_db"} 1\n', exposition)
+        self.assertIn('resource_pool_timeouts_total{pool="metrics_db"} 1\n', exposition)
+
+    def test_journal_mode_is_checked(self) -> None:
+        with self.assertRaises(TypeError):
+            SQLitePoolConfig.from_mapping({"path": self.db_path, "journal_mode": "wal; DROP TABLE x"})
+        config = SQLitePoolConfig(path=self.db_path, journal_mode="x")  # pyright: ignore[reportArgumentType]
+        with self.assertRaises(ValueError):
+            config.connect()
+
+
+class ResourceConfigTests(unittest.TestCase):
+    def test_duplicate_names_fail_validation(self) -> None:
+        from internal.config.resource import Resource
+
+        errors = Resource.validate({"sqlite": {"main": {"path": ":memory:"}}, "unix_socket": {"main": {"path": "x.sock"}}})
+        self.assertEqual([str(error) for error in errors], ["resource names must be unique: main"])
+
+
+class RegistryTests(unittest.TestCase):
+    def test_lazy_create_and_close(self) -> None:
+        created: list[str] = []
+        closed: list[str] = []
+        registry = Registry()
+
+        def factory() -> Pool[str]:
+            created.append("pool")
+            return Pool(name="text", create=lambda: "value", close=closed.append)
+
+        registry.register("text", factory)
+        self.assertEqual(created, [])
+        with registry.get("text").acquire() as value:
+            self.assertEqual(value, "value")
+        self.assertIs(registry.get("text"), registry.get("text"))
+        self.assertEqual(created, ["pool"])
+
+        hooks: list[str] = []
+        registry.on_close(lambda: hooks.append("closed"))
+        registry.close()
+        self.assertEqual(closed, ["value"])
+        self.assertEqual(hooks, ["closed"])
+
+        with self.assertRaises(KeyError):
+            registry.get("missing")
+
+    def test_reaper_closes_idle_items(self) -> None:
+        closed: list[str] = []
+        registry = Registry(reap_interval=0.01)
+        self.addCleanup(registry.close)
+        registry.register("text", lambda: Pool(name="text", create=lambda: "value", close=closed.append, idle_timeout=0.02))
+
+        with registry.get("text").acquire():
+            pass
+        deadline = time.monotonic() + 5
+        while not closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(closed, ["value"])
+        self.assertEqual(registry.get("text").stats.size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
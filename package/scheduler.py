@@ -0,0 +1,271 @@
+import asyncio
+import dataclasses
+import datetime
+import functools
+import inspect
+import logging
+import random
+import signal
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Final
+from typing import cast
+
+from package import metrics
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], Any]
+
+_CRON_FIELDS: Final = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+_CRON_SEARCH_LIMIT: Final = 366 * 24 * 60
+
+JOB_DURATION = metrics.histogram("schedule_job_duration_seconds", "Scheduled job run time.", ("job",))
+JOB_RUNS = metrics.counter("schedule_job_runs_total", "Scheduled job runs by result.", ("job", "result"))
+JOB_SKIPPED = metrics.counter("schedule_job_skipped_total", "Scheduled job runs skipped while still running.", ("job",))
+
+
+def _parse_cron_field(expression: str, name: str, minimum: int, maximum: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in expression.split(","):
+        value_range, _, step_str = part.partition("/")
+        step = int(step_str) if step_str else 1
+        if step < 1:
+            raise ValueError(f"Cron {name} step must be >= 1: {part!r}")
+
+        if value_range == "*":
+            start, end = minimum, maximum
+        elif "-" in value_range:
+            start_str, end_str = value_range.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(value_range)
+            end = maximum if step_str else start
+
+        if not minimum <= start <= end <= maximum:
+            raise ValueError(f"Cron {name} out of range {minimum}-{maximum}: {part!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != len(_CRON_FIELDS):
+            raise ValueError(f"Cron expression must have {len(_CRON_FIELDS)} fields: {expression!r}")
+
+        try:
+            parsed = [
+                _parse_cron_field(field, name, minimum, maximum)
+                for field, (name, minimum, maximum) in zip(fields, _CRON_FIELDS, strict=True)
+            ]
+        except ValueError as exc:
+            raise ValueError(f"Invalid cron expression {expression!r}: {exc}") from exc
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(weekday % 7 for weekday in weekdays)
+        # a field covering its whole range (e.g. "1-31") means "any", same as "*"
+        self._any_day = self.days == frozenset(range(1, 32))
+        self._any_weekday = self.weekdays == frozenset(range(7))
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+    def _day_matches(self, moment: datetime.datetime) -> bool:
+        day_match = moment.day in self.days
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, moment: datetime.datetime) -> datetime.datetime:
+        candidate = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        for _ in range(_CRON_SEARCH_LIMIT):
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + datetime.timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + datetime.timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += datetime.timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression {self.expression!r} never matches.")
+
+
+@dataclasses.dataclass(frozen=True)
+class Job:
+    name: str
+    func: JobFunc
+    interval: float | None = None
+    cron: CronExpression | None = None
+    jitter: float = 0.0
+
+    def __post_init__(self) -> None:
+        if (self.interval is None) == (self.cron is None):
+            raise ValueError(f"Job '{self.name}' must set exactly one of interval or cron.")
+        if self.interval is not None and self.interval <= 0:
+            raise ValueError(f"Job '{self.name}' interval must be > 0.")
+        if self.jitter < 0:
+            raise ValueError(f"Job '{self.name}' jitter must be >= 0.")
+
+    def next_delay(self) -> float:
+        if self.cron is not None:
+            now = datetime.datetime.now()
+            delay = (self.cron.next_after(now) - now).total_seconds()
+        else:
+            delay = cast(float, self.interval)
+        return delay + random.uniform(0, self.jitter)
+
+
+@dataclasses.dataclass
+class JobStats:
+    name: str
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+
+    def __post_init__(self) -> None:
+        self._duration = JOB_DURATION.labels(self.name)
+        self._succeeded = JOB_RUNS.labels(self.name, "success")
+        self._failed = JOB_RUNS.labels(self.name, "failure")
+        self._skipped = JOB_SKIPPED.labels(self.name)
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.runs if self.runs else 0.0
+
+    def skip(self) -> None:
+        self.skipped += 1
+        self._skipped.inc()
+
+    def record(self, seconds: float, failed: bool) -> None:
+        self._duration.observe(seconds)
+        (self._failed if failed else self._succeeded).inc()
+        self.runs += 1
+        self.failures += failed
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.last_seconds = seconds
+
+
+class Scheduler:
+    def __init__(
+        self,
+        jobs: list[Job],
+        *,
+        thread_pool_size: int = 8,
+        report_interval: float = 60.0,
+        shutdown_timeout: float = 30.0,
+    ) -> None:
+        names = [job.name for job in jobs]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate job names: {', '.join(duplicates)}")
+
+        self.jobs = jobs
+        self.stats: dict[str, JobStats] = {job.name: JobStats(name=job.name) for job in jobs}
+        self._thread_pool_size = thread_pool_size
+        self._report_interval = report_interval
+        self._shutdown_timeout = shutdown_timeout
+        self._running: dict[str, asyncio.Task[None]] = {}
+        self._stopped = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self.stop)
+
+        executor = ThreadPoolExecutor(max_workers=self._thread_pool_size, thread_name_prefix="schedule")
+        loops = [asyncio.create_task(self._job_loop(job=job, executor=executor), name=job.name) for job in self.jobs]
+        loops.append(asyncio.create_task(self._report_loop(), name="schedule-report"))
+        logger.info("Scheduler started with %d jobs.", len(self.jobs))
+        try:
+            await self._stopped.wait()
+        finally:
+            for task in loops:
+                task.cancel()
+            await asyncio.gather(*loops, return_exceptions=True)
+
+            running = list(self._running.values())
+            if running:
+                logger.info("Waiting up to %.1fs for %d running jobs.", self._shutdown_timeout, len(running))
+                _, pending = await asyncio.wait(running, timeout=self._shutdown_timeout)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+
+            executor.shutdown(wait=False, cancel_futures=True)
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(signum)
+            self.report()
+
+    async def _job_loop(self, job: Job, executor: ThreadPoolExecutor) -> None:
+        while True:
+            await asyncio.sleep(job.next_delay())
+            if job.name in self._running:
+                self.stats[job.name].skip()
+                logger.warning("Job '%s' is still running, skipped.", job.name)
+                continue
+
+            task = asyncio.create_task(self._execute(job=job, executor=executor), name=f"{job.name}-run")
+            self._running[job.name] = task
+            task.add_done_callback(lambda _, name=job.name: self._running.pop(name, None))
+
+    async def _execute(self, job: Job, executor: ThreadPoolExecutor) -> None:
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            if inspect.iscoroutinefunction(job.func):
+                await cast(Callable[[], Awaitable[Any]], job.func)()
+            else:
+                await asyncio.get_running_loop().run_in_executor(executor, functools.partial(job.func))
+        except asyncio.CancelledError:
+            # shutdown timeout: the run did not finish, so it must not count as a success
+            failed = True
+            logger.warning("Job '%s' was cancelled.", job.name)
+            raise
+        except Exception:
+            failed = True
+            logger.exception("Job '%s' failed.", job.name)
+        finally:
+            self.stats[job.name].record(seconds=time.perf_counter() - started_at, failed=failed)
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._report_interval)
+            self.report()
+
+    def report(self) -> None:
+        for name, stats in self.stats.items():
+            logger.info(
+                "Job '%s': runs=%d failures=%d skipped=%d mean=%.3fs max=%.3fs last=%.3fs",
+                name,
+                stats.runs,
+                stats.failures,
+                stats.skipped,
+                stats.mean_seconds,
+                stats.max_seconds,
+                stats.last_seconds,
+            )
+
+
+__all__ = ["CronExpression", "Job", "JobFunc", "JobStats", "Scheduler"]
@@ -0,0 +1,77 @@
+import asyncio
+import datetime
+import time
+import unittest
+
+from package.scheduler import CronExpression
+from package.scheduler import Job
+from package.scheduler import Scheduler
+
+
+class CronExpressionTests(unittest.TestCase):
+    def test_next_after(self) -> None:
+        moment = datetime.datetime(2026, 1, 31, 23, 58, 30)
+        self.assertEqual(CronExpression("* * * * *").next_after(moment), datetime.datetime(2026, 1, 31, 23, 59))
+        self.assertEqual(CronExpression("*/15 * * * *").next_after(moment), datetime.datetime(2026, 2, 1, 0, 0))
+        self.assertEqual(CronExpression("30 9 * * 1-5").next_after(moment), datetime.datetime(2026, 2, 2, 9, 30))
+        self.assertEqual(CronExpression("0 0 29 2 *").next_after(moment), datetime.datetime(2028, 2, 29, 0, 0))
+
+    def test_day_or_weekday(self) -> None:
+        cron = CronExpression("0 0 13 * 5")
+        moment = datetime.datetime(2026, 3, 1)
+        self.assertEqual(cron.next_after(moment), datetime.datetime(2026, 3, 6))
+        # a full range is "any": only the weekday restricts
+        self.assertEqual(CronExpression("0 0 1-31 * 5").next_after(moment), datetime.datetime(2026, 3, 6))
+        self.assertEqual(CronExpression("0 0 13 * 0-6").next_after(moment), datetime.datetime(2026, 3, 13))
+
+    def test_invalid(self) -> None:
+        for expression in ("* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *", "a * * * *"):
+            with self.assertRaises(ValueError):
+                CronExpression(expression)
+
+
+class SchedulerTests(unittest.TestCase):
+    def test_skip_if_still_running(self) -> None:
+        def slow() -> None:
+            time.sleep(0.25)
+
+        calls: list[float] = []
+
+        async def fast() -> None:
+            calls.append(time.monotonic())
+
+        scheduler = Scheduler(jobs=[Job(name="slow", func=slow, interval=0.05), Job(name="fast", func=fast, interval=0.05)])
+
+        async def run() -> None:
+            asyncio.get_running_loop().call_later(0.4, scheduler.stop)
+            await scheduler.run()
+
+        asyncio.run(run())
+        self.assertGreaterEqual(scheduler.stats["slow"].runs, 1)
+        self.assertGreater(scheduler.stats["slow"].skipped, 0)
+        self.assertEqual(scheduler.stats["fast"].skipped, 0)
+        self.assertEqual(scheduler.stats["fast"].runs, len(calls))
+
+    def test_cancelled_run_is_a_failure(self) -> None:
+        async def hang() -> None:
+            await asyncio.sleep(10)
+
+        scheduler = Scheduler(jobs=[Job(name="hang", func=hang, interval=0.01)], shutdown_timeout=0.05)
+
+        async def run() -> None:
+            asyncio.get_running_loop().call_later(0.1, scheduler.stop)
+            await scheduler.run()
+
+        asyncio.run(run())
+        stats = scheduler.stats["hang"]
+        self.assertEqual((stats.runs, stats.failures), (1, 1))
+
+    def test_job_requires_one_trigger(self) -> None:
+        with self.assertRaises(ValueError):
+            Job(name="x", func=lambda: None)
+        with self.assertRaises(ValueError):
+            Job(name="x", func=lambda: None, interval=1.0, cron=CronExpression("* * * * *"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,351 @@
+import asyncio
+import contextlib
+import enum
+import json
+import os
+import stat
+import struct
+import time
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from typing import BinaryIO
+from typing import Final
+
+from package.command import CommandException
+
+DEFAULT_CHUNK_SIZE: Final = 1 << 20
+DEFAULT_WRITE_BUFFER_SIZE: Final = 1 << 20
+DEFAULT_QUEUE_CHUNKS: Final = 4
+DEFAULT_FLUSH_INTERVAL: Final = 0.05
+STDIO: Final = "-"
+
+_FRAME_HEADER: Final = struct.Struct("!I")
+_EOF: Final = object()
+
+
+class RecordFormat(enum.Enum):
+    LINES = "lines"
+    JSONL = "jsonl"
+    FRAME = "frame"
+
+
+async def _read_pollable(fd: int, chunk_size: int) -> AsyncGenerator[bytes, None]:
+    # pipes, sockets and ttys are read non-blocking from the loop, so stopping early never leaves a read behind
+    loop = asyncio.get_running_loop()
+    blocking = os.get_blocking(fd)
+    os.set_blocking(fd, False)
+    try:
+        while True:
+            try:
+                chunk = os.read(fd, chunk_size)
+            except BlockingIOError:
+                readable = loop.create_future()
+                loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+                try:
+                    await readable
+                finally:
+                    loop.remove_reader(fd)
+                continue
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        # the fd may be shared with other processes (stdin), so leave it as it was
+        os.set_blocking(fd, blocking)
+
+
+async def _read_file(fd: int, chunk_size: int) -> AsyncGenerator[bytes, None]:
+    # regular files cannot be polled; a read on one always finishes, so a cancelled read is waited out
+    # before the caller can close the fd
+    loop = asyncio.get_running_loop()
+    while True:
+        read = loop.run_in_executor(None, os.read, fd, chunk_size)
+        try:
+            chunk = await asyncio.shield(read)
+        except asyncio.CancelledError:
+            await asyncio.wait([read])
+            raise
+        if not chunk:
+            return
+        yield chunk
+
+
+async def read_chunks(file: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncGenerator[bytes, None]:
+    fd = file.fileno()
+    mode = os.fstat(fd).st_mode
+    if stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode) or os.isatty(fd):
+        chunks = _read_pollable(fd=fd, chunk_size=chunk_size)
+    else:
+        chunks = _read_file(fd=fd, chunk_size=chunk_size)
+    async with contextlib.aclosing(chunks):
+        async for chunk in chunks:
+            yield chunk
+
+
+def _line_splitter(
+    parse: Callable[[bytes], Any],
+    skip_blank: bool,
+    describe: str,
+) -> Callable[[bytes | None], list[Any]]:
+    remainder = b""
+    line_number = 0
+
+    def parse_line(line: bytes) -> Any:
+        try:
+            return parse(line)
+        except ValueError as exc:
+            raise CommandException(f"Invalid {describe} line {line_number}: {exc}") from exc
+
+    def split(chunk: bytes | None) -> list[Any]:
+        nonlocal remainder, line_number
+        if chunk is None:
+            lines = [remainder] if remainder else []
+            remainder = b""
+        else:
+            lines = (remainder + chunk).split(b"\n")
+            remainder = lines.pop()
+        records: list[Any] = []
+        for line in lines:
+            line_number += 1
+            if skip_blank and not line.strip():
+                continue
+            records.append(parse_line(line))
+        return records
+
+    return split
+
+
+def _frame_splitter() -> Callable[[bytes | None], list[Any]]:
+    buffer = bytearray()
+
+    def split(chunk: bytes | None) -> list[Any]:
+        if chunk is None:
+            if buffer:
+                raise ValueError(f"Truncated frame: {len(buffer)} trailing bytes.")
+            return []
+        buffer.extend(chunk)
+        records: list[bytes] = []
+        offset = 0
+        while len(buffer) - offset >= _FRAME_HEADER.size:
+            (length,) = _FRAME_HEADER.unpack_from(buffer, offset)
+            end = offset + _FRAME_HEADER.size + length
+            if end > len(buffer):
+                break
+            records.append(bytes(buffer[offset + _FRAME_HEADER.size : end]))
+            offset = end
+        del buffer[:offset]
+        return records
+
+    return split
+
+
+def _decode_line(line: bytes) -> str:
+    return line.rstrip(b"\r").decode("utf-8")
+
+
+def _splitter(record_format: RecordFormat, source: str) -> Callable[[bytes | None], list[Any]]:
+    describe = f"{record_format.value} record in {'<stdin>' if source == STDIO else source}"
+    if record_format == RecordFormat.LINES:
+        return _line_splitter(parse=_decode_line, skip_blank=False, describe=describe)
+    if record_format == RecordFormat.JSONL:
+        return _line_splitter(parse=json.loads, skip_blank=True, describe=describe)
+    return _frame_splitter()
+
+
+async def read_record_chunks(
+    sources: list[str],
+    record_format: RecordFormat,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[list[Any]]:
+    for source in sources or [STDIO]:
+        split = _splitter(record_format=record_format, source=source)
+        if source == STDIO:
+            file = os.fdopen(0, "rb", buffering=0, closefd=False)
+        else:
+            file = Path(source).open("rb", buffering=0)
+        # the reader is closed before the file, also when the consumer stops early
+        with file:
+            async with contextlib.aclosing(read_chunks(file=file, chunk_size=chunk_size)) as chunks:
+                async for chunk in chunks:
+                    records = split(chunk)
+                    if records:
+                        yield records
+        records = split(None)
+        if records:
+            yield records
+
+
+async def read_records(
+    sources: list[str],
+    record_format: RecordFormat,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[Any]:
+    async for records in read_record_chunks(sources=sources, record_format=record_format, chunk_size=chunk_size):
+        for record in records:
+            yield record
+
+
+async def batched(
+    record_chunks: AsyncIterator[list[Any]],
+    size: int,
+    timeout: float | None = None,
+    queue_chunks: int = DEFAULT_QUEUE_CHUNKS,
+) -> AsyncIterator[list[Any]]:
+    if size < 1:
+        raise ValueError("Batch size must be >= 1.")
+
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_chunks)
+
+    async def produce() -> None:
+        try:
+            async for records in record_chunks:
+                await queue.put(records)
+        finally:
+            await queue.put(_EOF)
+
+    producer = asyncio.create_task(produce())
+    batch: list[Any] = []
+    batch_started_at = 0.0
+    try:
+        while True:
+            wait: float | None = None
+            if batch and timeout is not None:
+                wait = max(0.0, batch_started_at + timeout - time.monotonic())
+            try:
+                item = await asyncio.wait_for(queue.get(), wait) if wait is not None else await queue.get()
+            except TimeoutError:
+                yield batch
+                batch = []
+                continue
+
+            if item is _EOF:
+                break
+            if not batch:
+                batch_started_at = time.monotonic()
+            batch.extend(item)
+            while len(batch) >= size:
+                yield batch[:size]
+                batch = batch[size:]
+                batch_started_at = time.monotonic()
+        if batch:
+            yield batch
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+
+def encode_record(record: Any, record_format: RecordFormat) -> bytes:
+    if record_format == RecordFormat.JSONL:
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+    if isinstance(record, bytes | bytearray):
+        payload = bytes(record)
+    elif isinstance(record, memoryview):
+        payload = record.tobytes()
+    elif isinstance(record, str):
+        payload = record.encode()
+    else:
+        payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode()
+
+    if record_format == RecordFormat.FRAME:
+        return _FRAME_HEADER.pack(len(payload)) + payload
+    return payload + b"\n"
+
+
+class RecordWriter:
+    def __init__(
+        self,
+        file: BinaryIO,
+        record_format: RecordFormat,
+        buffer_size: int = DEFAULT_WRITE_BUFFER_SIZE,
+    ) -> None:
+        self._fd = file.fileno()
+        self._record_format = record_format
+        self._buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._pending: asyncio.Future[None] | None = None
+        self._lock = asyncio.Lock()
+        self.records = 0
+
+    def _write_all(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
+
+    async def _drain(self) -> None:
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            await pending
+
+    async def write(self, record: Any) -> None:
+        self._buffer += encode_record(record=record, record_format=self._record_format)
+        self.records += 1
+        if len(self._buffer) >= self._buffer_size:
+            await self.flush(wait=False)
+
+    async def write_many(self, records: list[Any]) -> None:
+        for record in records:
+            self._buffer += encode_record(record=record, record_format=self._record_format)
+        self.records += len(records)
+        if len(self._buffer) >= self._buffer_size:
+            await self.flush(wait=False)
+
+    async def flush(self, wait: bool = True) -> None:
+        # at most one write in flight: a full buffer waits for the previous write (backpressure)
+        async with self._lock:
+            await self._drain()
+            if self._buffer:
+                data, self._buffer = bytes(self._buffer), bytearray()
+                self._pending = asyncio.get_running_loop().run_in_executor(None, self._write_all, data)
+            if wait:
+                await self._drain()
+
+
+async def write_records(
+    records: AsyncIterable[Any],
+    writer: RecordWriter,
+    batches: bool = False,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+) -> None:
+    stopped = asyncio.Event()
+
+    async def flush_periodically() -> None:
+        # a slow input must not leave finished records sitting in a half-full buffer
+        while not stopped.is_set():
+            try:
+                await asyncio.wait_for(stopped.wait(), flush_interval)
+            except TimeoutError:
+                await writer.flush(wait=False)
+
+    flusher = asyncio.create_task(flush_periodically())
+    try:
+        async for item in records:
+            if batches:
+                await writer.write_many(records=item)
+            else:
+                await writer.write(record=item)
+    finally:
+        stopped.set()
+        await flusher
+    await writer.flush()
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "RecordFormat",
+    "RecordWriter",
+    "STDIO",
+    "batched",
+    "encode_record",
+    "read_chunks",
+    "read_record_chunks",
+    "read_records",
+    "write_records",
+]
@@ -0,0 +1,259 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from package.command import CommandException
+from package.stream import RecordFormat
+from package.stream import RecordWriter
+from package.stream import batched
+from package.stream import encode_record
+from package.stream import read_chunks
+from package.stream import read_records
+from package.stream import write_records
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CONFIG = """
+[application]
+name = "stream-test"
+secret = "x"
+[application.time_zone]
+[application.logger]
+version = 1
+"""
+PROBE_CODE = """
+import sys
+import types
+
+probe = types.ModuleType("script.stream_probe")
+exec(compile(sys.argv.pop(1), "<stream_probe>", "exec"), probe.__dict__)
+sys.modules[probe.__name__] = probe
+
+from command.root import command
+
+command.main(args=sys.argv[1:], prog_name="main.py")
+"""
+STREAM_FUNCTIONS = """
+async def upper(records):
+    async for record in records:
+        yield record.upper()
+
+
+async def first(records):
+    async for record in records:
+        yield record
+        return
+
+
+async def peak_memory(batches):
+    count = 0
+    async for batch in batches:
+        count += len(batch)
+    with open("/proc/self/status") as status:
+        peak = next(line.split()[1] for line in status if line.startswith("VmHWM:"))
+    yield [f"{count} {peak}"]
+"""
+
+
+async def collect(records: AsyncIterator[Any]) -> list[Any]:
+    return [record async for record in records]
+
+
+class ReadRecordsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def write(self, name: str, data: bytes) -> str:
+        path = Path(self.temp_dir.name) / name
+        path.write_bytes(data)
+        return str(path)
+
+    def read(self, sources: list[str], record_format: RecordFormat, chunk_size: int = 3) -> list[Any]:
+        # tiny chunks force records to straddle chunk boundaries
+        return asyncio.run(collect(read_records(sources=sources, record_format=record_format, chunk_size=chunk_size)))
+
+    def test_lines_across_files(self) -> None:
+        first = self.write("a.txt", b"alpha\r\nbeta\n\ngamma")
+        second = self.write("b.txt", "δelta\n".encode())
+        self.assertEqual(self.read([first, second], RecordFormat.LINES), ["alpha", "beta", "", "gamma", "δelta"])
+
+    def test_jsonl_skips_blank_lines(self) -> None:
+        source = self.write("a.jsonl", b'{"a": 1}\n\n[1, 2]\n"x"\n')
+        self.assertEqual(self.read([source], RecordFormat.JSONL), [{"a": 1}, [1, 2], "x"])
+
+    def test_jsonl_error_names_the_line(self) -> None:
+        source = self.write("a.jsonl", b'{"a": 1}\n\n{"a": \n')
+        with self.assertRaisesRegex(CommandException, f"Invalid jsonl record in {source} line 3: "):
+            self.read([source], RecordFormat.JSONL)
+
+    def test_pipe_read_stops_on_cancel(self) -> None:
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+
+        async def run() -> list[bytes]:
+            chunks: list[bytes] = []
+
+            async def consume() -> None:
+                with os.fdopen(read_fd, "rb", buffering=0, closefd=False) as file:
+                    async for chunk in read_chunks(file=file):
+                        chunks.append(chunk)
+
+            task = asyncio.create_task(consume())
+            os.write(write_fd, b"a")
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return chunks
+
+        # the writer never closes: the cancelled read must not keep asyncio.run waiting on a thread
+        self.assertEqual(asyncio.run(asyncio.wait_for(run(), 5)), [b"a"])
+        self.assertTrue(os.get_blocking(read_fd))
+
+    def test_frames(self) -> None:
+        payloads = [b"", b"one", bytes(range(256)) * 4]
+        data = b"".join(encode_record(record=payload, record_format=RecordFormat.FRAME) for payload in payloads)
+        source = self.write("a.bin", data)
+        self.assertEqual(self.read([source], RecordFormat.FRAME), payloads)
+
+        truncated = self.write("b.bin", data[:-1])
+        with self.assertRaises(ValueError):
+            self.read([truncated], RecordFormat.FRAME)
+
+
+class BatchedTests(unittest.TestCase):
+    def test_size(self) -> None:
+        async def chunks() -> AsyncIterator[list[int]]:
+            for start in range(0, 10, 3):
+                yield list(range(start, min(start + 3, 10)))
+
+        batches = asyncio.run(collect(batched(record_chunks=chunks(), size=4)))
+        self.assertEqual(batches, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+
+    def test_timeout_flushes_partial_batch(self) -> None:
+        async def chunks() -> AsyncIterator[list[int]]:
+            yield [1]
+            await asyncio.sleep(0.2)
+            yield [2, 3]
+
+        batches = asyncio.run(collect(batched(record_chunks=chunks(), size=10, timeout=0.02)))
+        self.assertEqual(batches, [[1], [2, 3]])
+
+
+class RecordWriterTests(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        records = [{"n": idx, "s": "é" * idx} for idx in range(1_000)]
+
+        async def produce() -> AsyncIterator[dict[str, Any]]:
+            for record in records:
+                yield record
+
+        for record_format in (RecordFormat.JSONL, RecordFormat.FRAME):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                path = Path(temp_dir) / "out"
+                with path.open("wb") as file:
+                    writer = RecordWriter(file=file, record_format=record_format, buffer_size=1_024)
+                    asyncio.run(write_records(records=produce(), writer=writer))
+                self.assertEqual(writer.records, len(records))
+
+                decoded = asyncio.run(collect(read_records(sources=[str(path)], record_format=record_format)))
+                if record_format == RecordFormat.FRAME:
+                    decoded = [json.loads(payload) for payload in decoded]
+                self.assertEqual(decoded, records)
+
+    def test_slow_input_is_flushed(self) -> None:
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+
+        async def run() -> bytes:
+            seen = asyncio.Event()
+
+            async def produce() -> AsyncIterator[str]:
+                yield "first"
+                await seen.wait()
+
+            with os.fdopen(write_fd, "wb", buffering=0) as file:
+                writer = RecordWriter(file=file, record_format=RecordFormat.LINES)
+                task = asyncio.create_task(write_records(records=produce(), writer=writer, flush_interval=0.01))
+                data = await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(None, os.read, read_fd, 64), 1)
+                seen.set()
+                await task
+            return data
+
+        self.assertEqual(asyncio.run(run()), b"first\n")
+
+
+@unittest.skipUnless(Path("/proc/self/status").exists(), "requires Linux /proc")
+class ScriptStreamTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = Path(temp_dir.name)
+        self.config_file_path = self.temp_dir / "config.toml"
+        self.config_file_path.write_text(CONFIG)
+
+    def start(self, *args: str, stdin: Any = subprocess.PIPE) -> subprocess.Popen[bytes]:
+        argv = ["-c", str(self.config_file_path), "script", "-m", "stream_probe", "--stream", *args]
+        return subprocess.Popen(
+            [sys.executable, "-c", PROBE_CODE, textwrap.dedent(STREAM_FUNCTIONS), *argv],
+            cwd=ROOT_DIR,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def test_lines_round_trip(self) -> None:
+        process = self.start("upper")
+        stdout, stderr = process.communicate(b"alpha\nbeta\n", timeout=30)
+        self.assertEqual(process.returncode, 0, stderr)
+        self.assertEqual(stdout, b"ALPHA\nBETA\n")
+
+    def test_early_stop_does_not_wait_for_stdin(self) -> None:
+        process = self.start("first")
+        assert process.stdin is not None and process.stdout is not None
+        self.addCleanup(process.stdin.close)
+        process.stdin.write(b"alpha\nbeta\n")
+        process.stdin.flush()
+        try:
+            # stdin stays open, like `tail -f | ...`
+            self.assertEqual(process.wait(timeout=30), 0)
+        finally:
+            process.kill()
+            process.communicate()
+
+    def test_invalid_jsonl_fails_with_line_number(self) -> None:
+        process = self.start("upper", "--format", "jsonl")
+        _, stderr = process.communicate(b'"a"\n{\n', timeout=30)
+        self.assertEqual(process.returncode, 1)
+        self.assertIn(b"Error: Invalid jsonl record in <stdin> line 2: ", stderr)
+
+    def test_memory_is_bounded_by_chunks(self) -> None:
+        def peak_kib(size: int) -> int:
+            source = self.temp_dir / f"input-{size}.txt"
+            with source.open("wb") as file:
+                line = b"x" * 1023 + b"\n"
+                for _ in range(size // len(line)):
+                    file.write(line)
+            process = self.start("peak_memory", "-i", str(source), "--batch-size", "1000", stdin=subprocess.DEVNULL)
+            stdout, stderr = process.communicate(timeout=60)
+            self.assertEqual(process.returncode, 0, stderr)
+            count, peak = stdout.split()
+            self.assertEqual(int(count), size // 1024)
+            return int(peak)
+
+        small = peak_kib(1 << 20)
+        large = peak_kib(64 << 20)
+        # 64 MiB of input may only add the in-flight chunks and batches, not the whole stream
+        self.assertLess(large - small, 24 << 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
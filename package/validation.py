@@ -0,0 +1,191 @@
+import dataclasses
+import glob
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import tomllib
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from pathlib import Path
+from typing import Any
+from typing import Final
+from typing import cast
+from typing import get_args
+
+from package.config import Config
+
+CACHE_VERSION: Final = 1
+
+_worker_config_cls: type[Config] | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class FileResult:
+    path: Path
+    digest: str
+    errors: tuple[str, ...]
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def config_classes(config_cls: type[Config]) -> list[type[Config]]:
+    found: list[type[Config]] = []
+    pending: list[Any] = [config_cls]
+    while pending:
+        annotation = pending.pop()
+        if isinstance(annotation, type) and issubclass(annotation, Config):
+            if annotation in found:
+                continue
+            found.append(annotation)
+            pending.extend(Config._cached_type_hints(annotation).values())  # pyright: ignore[reportPrivateUsage]
+        else:
+            pending.extend(get_args(annotation))
+    return found
+
+
+def schema_fingerprint(config_cls: type[Config]) -> str:
+    digest = hashlib.sha256(f"{CACHE_VERSION}:{config_cls.__module__}.{config_cls.__qualname__}".encode())
+    module_names = sorted({cls.__module__ for cls in config_classes(config_cls)} | {Config.__module__})
+    for module_name in module_names:
+        module_file = getattr(sys.modules[module_name], "__file__", None)
+        if module_file:
+            digest.update(Path(module_file).read_bytes())
+    return digest.hexdigest()
+
+
+def collect_files(targets: Iterable[str]) -> list[Path]:
+    files: dict[Path, None] = {}
+    for target in targets:
+        path = Path(target).expanduser()
+        if path.is_dir():
+            matches = sorted(path.rglob("*.toml"))
+        elif glob.has_magic(target):
+            matches = sorted(Path(match) for match in glob.glob(str(path), recursive=True))
+        else:
+            matches = [path]
+        for match in matches:
+            files[match.resolve()] = None
+    return list(files)
+
+
+def _init_worker(config_cls: type[Config]) -> None:
+    global _worker_config_cls
+    _worker_config_cls = config_cls
+    # resolve every type hint once per worker instead of on the first file
+    config_classes(config_cls)
+
+
+def _validate_data(config_cls: type[Config], path: Path, data: bytes, digest: str) -> FileResult:
+    try:
+        config_data = tomllib.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, tomllib.TOMLDecodeError) as exc:
+        return FileResult(path=path, digest=digest, errors=(f"Config file is not valid TOML: {exc}",))
+    try:
+        errors = tuple(str(error) for error in config_cls.validate(config_data=config_data))
+    except Exception as exc:
+        # validate() collects TypeError/ValueError; anything else a check raises still fails only this file
+        errors = (f"Config validation failed: {exc!r}",)
+    return FileResult(path=path, digest=digest, errors=errors)
+
+
+def _validate_in_worker(path: Path, data: bytes, digest: str) -> FileResult:
+    assert _worker_config_cls is not None, "worker is not initialized"
+    return _validate_data(config_cls=_worker_config_cls, path=path, data=data, digest=digest)
+
+
+class ResultCache:
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        self.path = path
+        self._fingerprint = fingerprint
+        self._entries: dict[str, dict[str, Any]] = {}
+        try:
+            document = cast(dict[str, Any], json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            return
+        if document.get("schema") == fingerprint:
+            self._entries = cast(dict[str, dict[str, Any]], document.get("files", {}))
+
+    def get(self, path: Path, digest: str) -> FileResult | None:
+        entry = self._entries.get(str(path))
+        if entry is None or entry.get("digest") != digest:
+            return None
+        return FileResult(path=path, digest=digest, errors=tuple(cast(list[str], entry["errors"])), cached=True)
+
+    def put(self, result: FileResult) -> None:
+        self._entries[str(result.path)] = {"digest": result.digest, "errors": list(result.errors)}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump({"schema": self._fingerprint, "files": self._entries}, file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def validate_files(
+    config_cls: type[Config],
+    paths: list[Path],
+    *,
+    workers: int,
+    cache: ResultCache | None = None,
+) -> Iterator[FileResult]:
+    pending: list[tuple[Path, bytes, str]] = []
+    for path in paths:
+        try:
+            data = path.read_bytes()
+        except OSError as exc:
+            yield FileResult(path=path, digest="", errors=(f"Config file is not readable: {exc}",))
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        cached = cache.get(path=path, digest=digest) if cache is not None else None
+        if cached is not None:
+            yield cached
+        else:
+            pending.append((path, data, digest))
+
+    if workers <= 1 or len(pending) <= 1:
+        results: Iterable[FileResult] = (_validate_data(config_cls, path, data, digest) for path, data, digest in pending)
+        for result in results:
+            if cache is not None:
+                cache.put(result)
+            yield result
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(pending)),
+        initializer=_init_worker,
+        initargs=(config_cls,),
+    ) as executor:
+        futures = {executor.submit(_validate_in_worker, path, data, digest): (path, digest) for path, data, digest in pending}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:
+                # the worker died (e.g. a broken pool); fail the file without caching so the next run retries it
+                path, digest = futures[future]
+                yield FileResult(path=path, digest=digest, errors=(f"Config validation failed: {exc!r}",))
+                continue
+            if cache is not None:
+                cache.put(result)
+            yield result
+
+
+__all__ = [
+    "FileResult",
+    "ResultCache",
+    "collect_files",
+    "config_classes",
+    "schema_fingerprint",
+    "validate_files",
+]
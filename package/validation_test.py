@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from click.testing import CliRunner
+
+from package.config import CONFIG_ENV_VAR
+from package.config import Config
+from package.validation import ResultCache
+from package.validation import collect_files
+from package.validation import schema_fingerprint
+from package.validation import validate_files
+
+
+class ServiceConfig(Config):
+    name: str
+    port: int
+
+
+class FleetConfig(Config):
+    service: ServiceConfig
+
+
+class StrictServiceConfig(ServiceConfig):
+    def check(self) -> None:
+        if self.name == "crash":
+            raise KeyError(self.name)
+
+
+class StrictFleetConfig(Config):
+    service: StrictServiceConfig
+
+
+class ValidationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        for idx in range(4):
+            (self.root / f"ok{idx}.toml").write_text(f'[service]\nname = "svc{idx}"\nport = {8000 + idx}\n')
+        (self.root / "nested").mkdir()
+        (self.root / "nested" / "bad.toml").write_text('[service]\nname = 1\nport = "x"\n')
+        (self.root / "broken.toml").write_text("[service\n")
+
+    def test_collect_files(self) -> None:
+        self.assertEqual(len(collect_files([str(self.root)])), 6)
+        self.assertEqual(len(collect_files([str(self.root / "ok*.toml"), str(self.root / "ok0.toml")])), 4)
+
+    def test_validate_files_with_pool_and_cache(self) -> None:
+        cache_path = self.root / "cache.json"
+        paths = collect_files([str(self.root)])
+
+        cache = ResultCache(path=cache_path, fingerprint=schema_fingerprint(FleetConfig))
+        results = {result.path.name: result for result in validate_files(FleetConfig, paths, workers=2, cache=cache)}
+        cache.save()
+        self.assertEqual(sorted(name for name, result in results.items() if not result.ok), ["bad.toml", "broken.toml"])
+        self.assertEqual(len(results["bad.toml"].errors), 2)
+        self.assertFalse(any(result.cached for result in results.values()))
+
+        (self.root / "ok0.toml").write_text('[service]\nname = "svc0"\nport = "changed"\n')
+        cache = ResultCache(path=cache_path, fingerprint=schema_fingerprint(FleetConfig))
+        results = {result.path.name: result for result in validate_files(FleetConfig, paths, workers=1, cache=cache)}
+        self.assertEqual(sorted(name for name, result in results.items() if not result.cached), ["ok0.toml"])
+        self.assertFalse(results["ok0.toml"].ok)
+
+        cache = ResultCache(path=cache_path, fingerprint="other-schema")
+        self.assertIsNone(cache.get(path=paths[0], digest=results[paths[0].name].digest))
+
+    def test_unexpected_check_error_fails_only_that_file(self) -> None:
+        (self.root / "ok1.toml").write_text('[service]\nname = "crash"\nport = 8001\n')
+        paths = collect_files([str(self.root / "ok*.toml")])
+        for workers in (1, 2):
+            results = {result.path.name: result for result in validate_files(StrictFleetConfig, paths, workers=workers)}
+            self.assertEqual(sorted(name for name, result in results.items() if not result.ok), ["ok1.toml"])
+            self.assertEqual(results["ok1.toml"].errors, ("Config validation failed: KeyError('crash')",))
+
+
+class ValidateCommandTests(unittest.TestCase):
+    def test_runs_without_app_config(self) -> None:
+        from command.root import command
+        from internal import config
+
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.dict(os.environ), mock.patch.object(config, "load") as load:
+            os.chdir(temp_dir)
+            os.environ.pop(CONFIG_ENV_VAR, None)
+            Path("candidate.toml").write_text('[application]\nname = "x"\nsecret = "x"\n[application.time_zone]\n')
+            result = CliRunner().invoke(command, ["config", "validate", "--no-cache", "candidate.toml"])
+            os.chdir(cwd)
+
+        self.assertEqual(result.exit_code, 1, result.output)
+        self.assertIn("application.logger must be set.", result.output)
+        self.assertIn("1 files, 1 failed, 0 cached.", result.output)
+        load.assert_not_called()
+
+    def test_validate_has_no_side_effects(self) -> None:
+        from internal.config import Config as InternalConfig
+
+        with (
+            mock.patch("logging.config.dictConfig") as dict_config,
+            mock.patch("time.tzset") as tzset,
+            mock.patch("package.cache.configure") as cache_configure,
+            mock.patch("package.queue.configure") as queue_configure,
+            mock.patch("package.resource.registry.register") as register,
+        ):
+            errors = InternalConfig.validate({})
+            application = {"name": "x", "secret": "x", "time_zone": {}, "logger": {"version": 1}}
+            self.assertEqual(InternalConfig.validate({"application": application}), [])
+
+        self.assertEqual([str(error) for error in errors], ["application must be set."])
+        for patched in (dict_config, tzset, cache_configure, queue_configure, register):
+            patched.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()